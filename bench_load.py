@@ -0,0 +1,77 @@
+# bench_load.py
+"""
+Benchmark of loading a project's per-task files: serial vs. parallel reads (storage.read_task_files).
+Usage: python bench_load.py [--sizes 1000 5000 20000] [--workers N] [--repeat 3]
+Each size gets a temporary tasks directory with that many legacy <uuid>.json task files.
+Note: after the first run the files are in the OS page cache; the gap between serial and
+parallel reads is largest on a cold cache or a slow/network drive.
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+from storage import READ_WORKERS, TaskJournal, read_task_files
+
+
+def make_task_files(tasks_dir, count):
+    os.makedirs(tasks_dir, exist_ok=True)
+    paths = []
+    for i in range(count):
+        task = {'id': str(uuid.uuid4()), 'text': f"Task {i} " + "lorem ipsum " * 8, 'status': 'Pending', 'order': i}
+        path = os.path.join(tasks_dir, f"{task['id']}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(task, f, indent=2, ensure_ascii=False)
+        paths.append(path)
+    return sorted(paths)
+
+
+def time_reads(paths, workers, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(len(batch) for batch in read_task_files(paths, workers=workers))
+        elapsed = time.perf_counter() - start
+        assert count == len(paths)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_migration(root, count):
+    """Time a full first open of a legacy project: migration into the journal plus replay."""
+    tasks_dir = os.path.join(root, 'migrate')
+    make_task_files(tasks_dir, count)
+    start = time.perf_counter()
+    tasks = TaskJournal(tasks_dir).load()
+    elapsed = time.perf_counter() - start
+    assert len(tasks) == count
+    start = time.perf_counter()
+    TaskJournal(tasks_dir).load()
+    return elapsed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--workers', type=int, default=READ_WORKERS)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'serial s':>10} {'parallel s':>11} {'speedup':>8} {'migrate s':>10} {'reopen s':>9}")
+    for size in args.sizes:
+        root = tempfile.mkdtemp(prefix='checklist-bench-')
+        try:
+            paths = make_task_files(os.path.join(root, 'files'), size)
+            serial = time_reads(paths, 1, args.repeat)
+            parallel = time_reads(paths, args.workers, args.repeat)
+            migrate, reopen = time_migration(root, size)
+            print(f"{size:>8} {serial:>10.3f} {parallel:>11.3f} {serial / parallel:>7.2f}x {migrate:>10.3f} {reopen:>9.3f}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -38,6 +38,8 @@ class CustomThemeDialog(QDialog):
         self.theme_params = theme_params
         self.get_contrasting = get_contrasting_func
         self.themes_path = themes_path
+        # Name of the theme saved by this dialog (the main window reloads and selects it)
+        self.saved_theme = None
         layout = QVBoxLayout()
         self.param_inputs = {}
         scroll = QScrollArea()
@@ -121,11 +123,5 @@ class CustomThemeDialog(QDialog):
         data[name] = vals
         with open(self.themes_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
-        # Update theme combo in main window
-        self.parent().themes = data
-        self.parent().theme_combo.clear()
-        self.parent().theme_combo.addItems(list(data.keys()))
-        idx = list(data.keys()).index(name)
-        self.parent().theme_combo.setCurrentIndex(idx)
-        self.parent().apply_theme()
+        self.saved_theme = name
         self.accept()
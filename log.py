@@ -0,0 +1,78 @@
+# log.py
+# Console logging for the app: the 'checklist' logger, gated by level.
+# Messages use logging's lazy %-formatting, so a disabled debug call formats nothing, and
+# nothing is written at all when stdout is not a terminal (e.g. the frozen GUI build).
+import logging
+import os
+import re
+import sys
+
+logger = logging.getLogger('checklist')
+
+# Level names accepted in CHECKLIST_LOG (e.g. CHECKLIST_LOG=debug)
+LEVEL_ENV = 'CHECKLIST_LOG'
+DEFAULT_LEVEL = logging.WARNING
+
+
+class ColorFormatter(logging.Formatter):
+    """
+    Formats records as "[LEVEL] message" and colors the level name and the >, <, +, =, -, |
+    and ! markers in a single pass of one precompiled pattern.
+    """
+    PATTERN = re.compile(r'DEBUG|[><]|[+=|\-]|!')
+
+    def __init__(self, colors):
+        super().__init__('[%(levelname)s] %(message)s')
+        # matched text (or its first character) -> color code; reset code under None
+        self._colors = colors
+        self._reset = colors[None]
+
+    def _color(self, match):
+        text = match.group(0)
+        return self._colors.get(text, self._colors.get(text[0], '')) + text + self._reset
+
+    def format(self, record):
+        return self.PATTERN.sub(self._color, super().format(record))
+
+
+def _terminal_colors():
+    """
+    Color codes for ColorFormatter (colorama also makes them work on Windows consoles), or
+    None without colorama.
+    """
+    try:
+        import colorama
+        colorama.init()
+        from colorama import Fore, Style
+    except ImportError:
+        return None
+    marker = Fore.YELLOW
+    return {'DEBUG': Fore.GREEN, '>': Fore.LIGHTYELLOW_EX, '<': Fore.LIGHTYELLOW_EX,
+            '+': marker, '=': marker, '-': marker, '|': marker, '!': Fore.RED,
+            None: Style.RESET_ALL}
+
+
+def setup(stream=None):
+    """
+    Configure the logger once at startup. The level comes from CHECKLIST_LOG (default
+    WARNING). When stream (default sys.stdout) is not a terminal nothing is written, unless
+    CHECKLIST_LOG is set, in which case plain uncolored lines are written.
+    """
+    stream = stream if stream is not None else sys.stdout
+    name = os.environ.get(LEVEL_ENV, '').strip().upper()
+    level = logging.getLevelName(name) if name else DEFAULT_LEVEL
+    if not isinstance(level, int):
+        level = DEFAULT_LEVEL
+    logger.handlers.clear()
+    logger.propagate = False
+    is_tty = stream is not None and hasattr(stream, 'isatty') and stream.isatty()
+    if not is_tty and not name:
+        # No console to write to: every call returns at the level check
+        logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.CRITICAL + 1)
+        return
+    handler = logging.StreamHandler(stream)
+    colors = _terminal_colors() if is_tty else None
+    handler.setFormatter(ColorFormatter(colors) if colors else logging.Formatter('[%(levelname)s] %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(level)
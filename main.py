@@ -1,39 +1,32 @@
-
-
-
-# --- Robust import error handler and Qt plugin path debug ---
+# --- Robust import error handler ---
+# Only what the window needs to show is imported here; rarely used modules (custom_theme_dialog,
+# QInputDialog, random/string, uuid) are imported where used, colorama only for a terminal.
+import time
+_IMPORT_START = time.perf_counter()
 try:
     import sys
     import os
-    print("[DEBUG] sys.executable:", sys.executable)
-    print("[DEBUG] __file__:", __file__)
-    qt_plugin_env = os.environ.get('QT_QPA_PLATFORM_PLUGIN_PATH', None)
-    print("[DEBUG] QT_QPA_PLATFORM_PLUGIN_PATH:", qt_plugin_env)
-    # Try to guess the plugin path relative to the exe or script
-    exe_dir = os.path.dirname(sys.executable)
-    plugin_guess = os.path.join(exe_dir, 'PyQt5', 'Qt', 'plugins', 'platforms')
-    print("[DEBUG] Expected plugin dir:", plugin_guess)
-    import random
-    import string
     from PyQt5.QtWidgets import (
         QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-        QTableWidget, QTableWidgetItem, QComboBox, QLineEdit, QLabel, QMessageBox,
-        QInputDialog, QListWidget, QListWidgetItem, QHeaderView, QMenu, QStyledItemDelegate
+        QTableView, QAbstractItemView, QComboBox, QLineEdit, QLabel, QMessageBox,
+        QListWidget, QListWidgetItem, QHeaderView, QStyledItemDelegate, QProgressBar
     )
-    from PyQt5.QtCore import Qt, QTimer
+    from PyQt5.QtCore import Qt, QByteArray, QTimer, pyqtSignal
     import re
-    try:
-        import colorama
-        colorama.init()
-        from colorama import Fore, Style
-    except ImportError:
-        # fallback: define dummy Fore/Style
-        class Dummy:
-            RESET_ALL = ''
-        class DummyFore(Dummy):
-            GREEN = YELLOW = RED = CYAN = MAGENTA = GREY = ''
-        Fore = DummyFore()
-        Style = Dummy()
+    from log import logger as log, setup as setup_logging
+    from storage import open_storage, FileStorage, TrashReclaimer
+    from watcher import ProjectWatcher
+    from write_behind import WriteBehindStorage
+    from project_cache import ProjectCache
+    from project_loader import ProjectLoader
+    from models import Project, Task, MANUAL_SORT
+    from search_index import SearchIndex
+    from text_wrap import WrapCache
+    from project_list import ProjectListModel, ProjectListView
+    from settings import SettingsStore
+    from startup_snapshot import StartupSnapshot
+    from themes import ThemeFile, ThemeCache, contrasting_font_color, PROJECT_LIST_NAME, TASK_LIST_NAME
+    from task_table import TaskTableModel, TaskFilter, ProgressiveLoader, resize_rows, ButtonDelegate, StatusDelegate, COL_TEXT, COL_STATUS, STATUSES
 except Exception as e:
     import traceback
     print("\nFATAL IMPORT ERROR:\n" + traceback.format_exc(), file=sys.stderr)
@@ -42,22 +35,6 @@ except Exception as e:
 
 checklistAppVersion = "1.2.0"
 
-def cprint(*args, **kwargs):
-    text = ' '.join(str(a) for a in args)
-    # List of (pattern, color) tuples, multi-character patterns first
-    patterns = [
-        (r'[><]', Fore.LIGHTYELLOW_EX),
-        (r'\+', Fore.YELLOW),
-        (r'=', Fore.YELLOW),
-        (r'-', Fore.YELLOW),
-        (r'!', Fore.RED),
-        (r'\|', Fore.YELLOW),
-        (r'DEBUG', Fore.GREEN),
-    ]
-    for pat, color in patterns:
-        text = re.sub(pat, lambda m: color + m.group(0) + Style.RESET_ALL, text)
-    print(text, **kwargs)
-
 # Word wrap delegate for Task/Note column
 class WordWrapDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
@@ -74,83 +51,69 @@ class WordWrapDelegate(QStyledItemDelegate):
         return super().sizeHint(option, index)
 
 class ChecklistApp(QMainWindow):
+    # Emitted (from the write-behind worker thread) when saving tasks failed
+    writeFailed = pyqtSignal(str)
+    # How long a deleted project can be restored before it is physically removed
+    UNDO_DELETE_MS = 10000
+    # Projects with at least this many tasks are shown a screenful first, the rest in idle-time chunks
+    PROGRESSIVE_LOAD_MIN = 5000
+    # Projects are read after the first paint of the window, or after this long if it is not shown
+    STARTUP_FALLBACK_MS = 250
+
     def _wrap_with_marker(self, text, marker='↪ '):
         """
         Wrap text for display in the Task/Note column, adding a marker to wrapped lines.
         Uses the actual column width and font metrics for accurate wrapping.
-        Accounts for cell padding and marker width.
+        Accounts for cell padding and marker width. Layouts are cached (see text_wrap.WrapCache).
         """
-        from PyQt5.QtGui import QFontMetrics
-        col = 2
         if not hasattr(self, 'task_list'):
             return text
-        col_width = self.task_list.columnWidth(col)
+        return self._wrap_cache.wrap(text, self._wrap_width(), self.task_list.font(), marker)
+
+    def _row_height_for(self, wrapped):
+        """
+        Row height for wrapped text: its lines at the table font's line height, plus the pixel
+        the item delegate adds (what resizeRowToContents() would measure), at least 40px.
+        """
+        min_height = 40
+        lines = wrapped.count('\n') + 1
+        return max(min_height, lines * self._wrap_cache.line_height(self.task_list.font()) + 1)
+
+    def _wrap_width(self, col_width=None):
+        if col_width is None:
+            col_width = self.task_list.columnWidth(COL_TEXT)
         # Subtract a margin for padding, scrollbar, etc.
         margin = 30  # pixels, adjust as needed
-        avail_width = max(10, col_width - margin)
-        font = self.task_list.font()
-        metrics = QFontMetrics(font)
-        marker_width = metrics.width(marker)
-        lines = text.splitlines() if '\n' in text else [text]
-        wrapped = []
-        for line in lines:
-            if not line:
-                wrapped.append("")
-                continue
-            current = ""
-            first_line = True
-            for word in line.split(' '):
-                if not current:
-                    current = word
-                else:
-                    # Use less width for wrapped lines (marker included)
-                    width_limit = avail_width if first_line else avail_width - marker_width
-                    if metrics.width(current + ' ' + word) > width_limit:
-                        wrapped.append(current)
-                        current = marker + word
-                        first_line = False
-                    else:
-                        current += ' ' + word
-            wrapped.append(current)
-        return '\n'.join(wrapped)
+        return max(10, col_width - margin)
+
     def get_contrasting_font_color(self, bg_hex):
         """
         Given a background hex color, return '#000000' or '#ffffff' for best contrast.
         """
-        if not bg_hex or not isinstance(bg_hex, str):
-            return '#000000'
-        hex_color = bg_hex.lstrip('#')
-        if len(hex_color) == 3:
-            hex_color = ''.join([c*2 for c in hex_color])
-        try:
-            r = int(hex_color[0:2], 16)
-            g = int(hex_color[2:4], 16)
-            b = int(hex_color[4:6], 16)
-        except Exception:
-            return '#000000'
-        # Per W3C luminance formula
-        luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255
-        return '#000000' if luminance > 0.5 else '#ffffff'
+        return contrasting_font_color(bg_hex)
+
     def refreshProjectTab(self, selected_project_id=None):
         """
         Refreshes the project list UI and updates the project label and task list to match the current selection.
         If selected_project_id is provided, selects and loads that project. Otherwise, keeps the current selection.
         """
-        cprint("[DEBUG] refreshProjectTab called. selected_project_id:", selected_project_id)
+        log.debug("refreshProjectTab called. selected_project_id: %s", selected_project_id)
         self.refresh_project_list(selected_project_id=selected_project_id)
         QApplication.processEvents()
         idx = self.project_list.currentRow()
-        cprint(f"[DEBUG] After refresh, currentRow is {idx}, project count is {self.project_list.count()}")
+        log.debug("After refresh, currentRow is %d, project count is %d", idx, self.project_list.count())
         if idx >= 0 and idx < self.project_list.count():
-            cprint(f"[DEBUG] Loading project at row {idx}")
+            log.debug("Loading project at row %d", idx)
             self.load_project(idx)
         else:
-            cprint("[DEBUG] No project selected after refresh.")
+            log.debug("No project selected after refresh.")
             self.current_project = None
             self.project_label.setText("No project selected")
-            self.task_list.setRowCount(0)
-    def __init__(self):
+            self.task_model.clear()
+    def __init__(self, startup_profile=None):
         super().__init__()
+        # StartupProfile of --profile-startup (startup_profile.py), else None
+        self.startup_profile = startup_profile
         self.setWindowTitle("Checklist {}".format(checklistAppVersion))
         # Set window icon (top left)
         import os
@@ -159,35 +122,172 @@ class ChecklistApp(QMainWindow):
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
         self.resize(1600, 850)
+        # UI state (theme, sort mode, geometry, selected project), written debounced
+        self.settings = SettingsStore(self.get_base_path(), parent=self)
         self.current_project = None
+        # All project/task disk I/O goes through the storage backend; task writes are
+        # queued and written by a background thread (flushed on exit)
+        self._write_error_shown = False
+        self.writeFailed.connect(self._on_write_failed)
+        # Recently used projects stay parsed in memory (validated against disk on every switch)
+        self.project_cache = ProjectCache()
+        # Full-text index over all projects (search_index.db), updated as tasks are written
+        self.search_index = SearchIndex(self.get_base_path())
+        self.storage = WriteBehindStorage(open_storage(self.get_base_path()),
+                                          on_error=lambda exc: self.writeFailed.emit(str(exc)),
+                                          on_written=self._on_storage_written)
+        # Deleted projects go to the trash; the reclaimer removes them in the background
+        # (including anything left over from a previous session, see _finish_startup)
+        self.reclaimer = TrashReclaimer(self.storage.purge_trash)
+        # Projects missing from the cache are read and parsed on a worker thread; _loading_project
+        # is the id whose load is awaited, _reveal_task a search hit to select once it is shown
+        self.project_loader = ProjectLoader(self.storage, self)
+        self.project_loader.loaded.connect(self._on_project_loaded)
+        self.project_loader.failed.connect(self._on_project_load_failed)
+        self._loading_project = None
+        self._reveal_task = None
+        self._pending_delete = None
+        # Started by _finish_startup (file backend only)
+        self.watcher = None
+        self.projects = []
         self.init_ui()
+        geometry = self.settings.get('window_geometry')
+        if geometry:
+            self.restoreGeometry(QByteArray.fromBase64(geometry.encode('ascii')))
+        self._mark('window built')
+        # What the window showed at the last exit, if still valid (startup_snapshot.json)
+        self.startup_snapshot = StartupSnapshot(self.get_base_path())
+        self._snapshot_version = None
+        self._restore_snapshot()
+        # Everything that reads projects from disk runs once the window shell was painted
+        # (or after a moment if the window is not shown)
+        self._startup_pending = True
+        QTimer.singleShot(self.STARTUP_FALLBACK_MS, self._finish_startup)
 
-    def load_all_projects(self):
-        import os, json
-        projects_dir = os.path.join(self.get_base_path(), 'projects')
-        projects = []
-        cprint(f"[DEBUG] Looking for projects in: {projects_dir}")
-        if os.path.exists(projects_dir):
-            for fname in os.listdir(projects_dir):
-                if fname.endswith('.json'):
-                    fpath = os.path.join(projects_dir, fname)
-                    try:
-                        with open(fpath, 'r', encoding='utf-8') as f:
-                            proj = json.load(f)
-                            if isinstance(proj, dict) and 'id' in proj and 'name' in proj:
-                                if 'favourite' not in proj:
-                                    proj['favourite'] = False
-                                projects.append({'id': proj['id'], 'name': proj['name'], 'favourite': proj['favourite']})
-                                cprint(f"[DEBUG] Loaded project: {proj['name']} (ID: {proj['id']})")
-                    except Exception as e:
-                        cprint(f"[DEBUG] Failed to load {fpath}: {e}")
-        cprint(f"[DEBUG] Total projects loaded: {len(projects)}")
-        return projects
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._startup_pending:
+            # Let the first frame reach the screen before reading projects
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _mark(self, phase):
+        if self.startup_profile is not None:
+            self.startup_profile.mark(phase)
+
+    def _finish_startup(self):
+        """
+        Startup work deferred to the event loop, so the window shows before any project is read:
+        reclaim the trash, start the watcher, list the projects and reopen the last one.
+        """
+        if not self._startup_pending:
+            return
+        self._startup_pending = False
+        for project_id in self.storage.list_trash():
+            self.reclaimer.reclaim(project_id)
+        # Pick up changes made by other instances/tools (file backend only; the SQLite
+        # backend notices other connections through the project cache's version check)
+        if isinstance(self.storage.backend, FileStorage):
+            self.watcher = ProjectWatcher(self.storage.backend, self)
+            self.watcher.projectAdded.connect(self._on_project_added)
+            self.watcher.projectUpdated.connect(self._on_project_updated)
+            self.watcher.projectRemoved.connect(self._on_project_removed)
+            self.watcher.tasksChanged.connect(self._on_tasks_changed)
+            self.watcher.tasksReset.connect(self._on_tasks_reset)
+        self._startup_refreshed = False
+        self.refresh_project_list()
+        self._startup_refreshed = True
+        self._mark('projects listed')
+        proj = self.current_project
+        if proj is not None:
+            # Shown from the snapshot: reconcile it with what is on disk now
+            if self.project_model.row_of(proj.id) < 0:
+                self.load_project(-1)
+            elif self.storage.project_version(proj.id) != self._snapshot_version:
+                self.load_project_by_id(proj.id)
+            elif self.watcher is not None:
+                self.watcher.watch_project(proj.id)
+        if self.current_project is None and self.project_list.count() > 0:
+            row = self.project_list.currentRow()
+            if row >= 0:
+                # Selected from the snapshot without its tasks
+                self.load_project(row)
+            else:
+                # Reopen the project selected last time (else the first one); the row change loads it
+                self.project_list.setCurrentRow(max(0, self.project_model.row_of(self.settings.get('selected_project'))))
+            self._mark('project requested')
+        # Index projects that are new or changed since the last session, in the background
+        self.search_index.request_sync(self.storage)
+        self._mark('startup complete')
 
+    def _restore_snapshot(self):
+        """
+        Show the sidebar and the open project as they were at the last exit, provided nothing
+        changed on disk since (a few stats, no project is read); _finish_startup reconciles.
+        """
+        if not self.storage.persistent_versions:
+            return
+        snapshot = self.startup_snapshot.load()
+        if snapshot is None or not StartupSnapshot.matches(snapshot.get('listing_version'),
+                                                           self.storage.listing_version()):
+            return
+        self.projects = snapshot['projects']
+        saved = snapshot.get('project')
+        project_id = saved['meta']['id'] if saved else None
+        self.project_list.blockSignals(True)
+        self.project_model.set_projects(self.projects)
+        row = self.project_model.row_of(project_id)
+        if row >= 0:
+            self.project_list.setCurrentRow(row)
+        self.project_list.blockSignals(False)
+        self._mark('snapshot sidebar')
+        if row < 0 or saved.get('tasks') is None or saved.get('sort_mode') != self.sort_mode():
+            return
+        version = self.storage.project_version(project_id)
+        if not StartupSnapshot.matches(saved.get('version'), version):
+            return
+        proj = Project.from_storage(saved['meta'], saved['tasks'])
+        self.project_cache.put(project_id, proj, version)
+        self._snapshot_version = version
+        self.current_project = proj
+        self.project_label.setText(f"Project: {proj.name}")
+        self.display_tasks()
+        self._mark('snapshot project')
+
+    def _save_snapshot(self):
+        """
+        Record the sidebar and the open project for the next launch (after the storage was
+        flushed, so the version tokens describe what was written).
+        """
+        listing_version = self.storage.listing_version() if self.storage.persistent_versions else None
+        projects = [self.project_model.project_at(row) for row in range(self.project_model.rowCount())]
+        saved = None
+        proj = self.current_project
+        if proj is not None and listing_version is not None:
+            tasks = None
+            # Large projects load progressively anyway; unsaved edits must not be restored
+            if len(proj.tasks) < self.PROGRESSIVE_LOAD_MIN and not self._write_error_shown:
+                tasks = [task.to_dict() for task in proj.ordered(self.sort_mode())]
+            saved = {'meta': {'id': proj.id, 'name': proj.name, 'favourite': proj.favourite},
+                     'version': self.storage.project_version(proj.id),
+                     'sort_mode': self.sort_mode(),
+                     'tasks': tasks}
+        self.startup_snapshot.save(listing_version, projects, saved)
 
+    def _on_storage_written(self, project_id, version_before, version_after):
+        # Called from the write-behind thread after every write
+        self.project_cache.note_write(project_id, version_before, version_after)
+        self.search_index.note_write(project_id, version_before, version_after)
+
+    def load_all_projects(self):
+        log.debug("Loading projects from storage: %s", type(self.storage).__name__)
+        projects = self.storage.list_projects()
+        for proj in projects:
+            log.debug("Loaded project: %s (ID: %s)", proj['name'], proj['id'])
+        log.debug("Total projects loaded: %d", len(projects))
+        return projects
 
     def init_ui(self):
-        import os, json
+        import os
         from PyQt5.QtWidgets import QTextEdit
         # --- Main widget and layout ---
         main_widget = QWidget()
@@ -198,19 +298,15 @@ class ChecklistApp(QMainWindow):
         theme_label = QLabel("Theme:")
         theme_bar.addWidget(theme_label)
         self.theme_combo = QComboBox()
-        self.themes = {}
-        self.last_theme = None
+        self._compiled_themes = ThemeCache()
+        # Theme definitions are read once (and again only if themes.json changes); the
+        # selected theme is a setting
         self._themes_path = os.path.join(self.get_base_path(), 'themes.json')
-        if os.path.exists(self._themes_path):
-            try:
-                with open(self._themes_path, 'r', encoding='utf-8') as f:
-                    all_themes = json.load(f)
-                if isinstance(all_themes, dict) and 'last_theme' in all_themes:
-                    self.last_theme = all_themes.pop('last_theme')
-                self.themes = all_themes
-                self.theme_combo.addItems(list(self.themes.keys()))
-            except Exception:
-                self.themes = {}
+        self.theme_file = ThemeFile(self._themes_path)
+        self.themes = self.theme_file.load()
+        last_theme = self.settings.get('last_theme', self.theme_file.legacy_last_theme)
+        if self.theme_file.exists():
+            self.theme_combo.addItems(list(self.themes.keys()))
         else:
             self.theme_combo.addItems(["Light", "Dark"])
         self.theme_combo.currentIndexChanged.connect(self.apply_theme)
@@ -223,8 +319,8 @@ class ChecklistApp(QMainWindow):
         main_layout.addLayout(theme_bar)
 
         # Set theme combo to last used theme if available
-        if self.last_theme and self.last_theme in self.themes:
-            idx = list(self.themes.keys()).index(self.last_theme)
+        if last_theme and last_theme in self.themes:
+            idx = list(self.themes.keys()).index(last_theme)
             self.theme_combo.setCurrentIndex(idx)
 
         # --- Main content area (horizontal split) ---
@@ -237,7 +333,34 @@ class ChecklistApp(QMainWindow):
         new_project_btn = QPushButton("New Project")
         new_project_btn.clicked.connect(self.new_project)
         project_area.addWidget(new_project_btn)
-        self.project_list = QListWidget()
+        # Search across all projects (served from the search index, no project is opened)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search all projects...")
+        self.search_input.setClearButtonEnabled(True)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self.run_search)
+        self.search_input.textChanged.connect(lambda _: self._search_timer.start())
+        self.search_input.returnPressed.connect(self.run_search)
+        # Words: ranked word search; Substring/Regex: any fragment (ticket ids, paths, code)
+        self.search_mode = QComboBox()
+        self.search_mode.addItems(["Words", "Substring", "Regex"])
+        self.search_mode.currentIndexChanged.connect(lambda _: self.run_search())
+        search_bar = QHBoxLayout()
+        search_bar.addWidget(self.search_input, 1)
+        search_bar.addWidget(self.search_mode)
+        project_area.addLayout(search_bar)
+        self.search_results = QListWidget()
+        self.search_results.itemActivated.connect(self.open_search_result)
+        self.search_results.itemClicked.connect(self.open_search_result)
+        self.search_results.hide()
+        project_area.addWidget(self.search_results)
+        # Projects are served by a persistent model; changes insert/move/remove single rows
+        self.project_model = ProjectListModel(self)
+        self.project_list = ProjectListView()
+        self.project_list.setObjectName(PROJECT_LIST_NAME)
+        self.project_list.setModel(self.project_model)
         self.project_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.project_list.customContextMenuRequested.connect(self.open_project_context_menu)
         self.project_list.currentRowChanged.connect(self.load_project)
@@ -256,30 +379,82 @@ class ChecklistApp(QMainWindow):
         sort_layout.addWidget(sort_label)
         self.sort_combo = QComboBox()
         self.sort_combo.addItems(["Status", "Alphanumeric", "Oldest"])
+        sort_idx = self.sort_combo.findText(self.settings.get('sort_mode', ''))
+        if sort_idx >= 0:
+            self.sort_combo.setCurrentIndex(sort_idx)
         self.sort_combo.currentIndexChanged.connect(self.sort_tasks_by_mode)
         sort_layout.addWidget(self.sort_combo)
         sort_layout.addStretch(1)
+        # Filter the rows of the open project as you type (rows are hidden, not rebuilt)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter tasks...")
+        self.filter_input.setClearButtonEnabled(True)
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(100)
+        self._filter_timer.timeout.connect(self.apply_task_filter)
+        self.filter_input.textChanged.connect(lambda _: self._filter_timer.start())
+        sort_layout.addWidget(self.filter_input, 2)
         right_layout.addLayout(sort_layout)
 
-        self.task_list = QTableWidget(0, 4)
-        self.task_list.setHorizontalHeaderLabels(["", "", "Task/Note", "Status"])
+        # Tasks are served by a model; buttons and status dropdowns are painted by delegates
+        self.task_list = QTableView()
+        self.task_list.setObjectName(TASK_LIST_NAME)
+        self.task_model = TaskTableModel(self.task_list)
+        self._wrap_cache = WrapCache()
+        self.task_model.set_wrap_func(lambda text: self._wrap_with_marker(text, marker='↪ '), self._row_height_for)
+        self.task_model.statusEdited.connect(self.update_status)
+        self.task_model.taskDropped.connect(self.move_task)
+        self.task_list.setModel(self.task_model)
         self.task_list.setColumnWidth(0, 32)
         self.task_list.setColumnWidth(1, 32)
         self.task_list.setColumnWidth(3, 100)
         self.task_list.verticalHeader().setVisible(False)
-        self.task_list.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.task_list.setSelectionBehavior(QTableWidget.SelectRows)
-        self.task_list.setSelectionMode(QTableWidget.SingleSelection)
-        self.task_list.cellClicked.connect(self.handle_table_click)
+        # Rows start at the minimum height; only rows scrolled into view are measured
+        self.task_list.verticalHeader().setDefaultSectionSize(40)
+        self.task_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.task_list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.task_list.setSelectionMode(QAbstractItemView.SingleSelection)
+        # Rows can be dragged to reorder them (the model only allows it in the Status sort)
+        self.task_list.setDragEnabled(True)
+        self.task_list.setAcceptDrops(True)
+        self.task_list.setDropIndicatorShown(True)
+        self.task_list.setDragDropMode(QAbstractItemView.InternalMove)
+        self.task_list.setDragDropOverwriteMode(False)
+        self.task_list.setDefaultDropAction(Qt.MoveAction)
+        self.task_list.clicked.connect(lambda index: self.handle_table_click(index.row(), index.column()))
         self.task_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.task_list.customContextMenuRequested.connect(self.open_context_menu)
         self.task_list.setWordWrap(True)
+        self.task_list.setMouseTracking(True)
         header = self.task_list.horizontalHeader()
         header.setSectionResizeMode(2, QHeaderView.Stretch)
         header.setSectionResizeMode(0, QHeaderView.Fixed)
         header.setSectionResizeMode(1, QHeaderView.Fixed)
         header.setSectionResizeMode(3, QHeaderView.Fixed)
+        self.task_list.setItemDelegateForColumn(0, ButtonDelegate(self.task_list))
+        self.task_list.setItemDelegateForColumn(1, ButtonDelegate(self.task_list))
         self.task_list.setItemDelegateForColumn(2, WordWrapDelegate(self.task_list))
+        self.task_list.setItemDelegateForColumn(3, StatusDelegate(self.task_list))
+        # Lazy row sizing: measure rows when they become visible instead of on insert
+        self._sized_rows = set()
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.timeout.connect(self._resize_visible_rows)
+        self.task_model.modelReset.connect(self._invalidate_row_sizes)
+        self.task_model.rowsInserted.connect(self._invalidate_row_sizes)
+        self.task_model.rowsRemoved.connect(self._invalidate_row_sizes)
+        self.task_model.layoutChanged.connect(self._invalidate_row_sizes)
+        self.task_model.set_drag_enabled(self.sort_mode() == MANUAL_SORT)
+        # Respaces crowded ranks once moves have settled
+        self._rebalance_timer = QTimer(self)
+        self._rebalance_timer.setSingleShot(True)
+        self._rebalance_timer.setInterval(2000)
+        self._rebalance_timer.timeout.connect(self.rebalance_task_orders)
+        self.task_list.verticalScrollBar().valueChanged.connect(lambda _: self._resize_timer.start(0))
+        header.sectionResized.connect(self._on_task_column_resized)
+        self.task_filter = TaskFilter(self.task_list, self.task_model)
+        self.task_loader = ProgressiveLoader(self.task_model, self)
         right_layout.addWidget(self.task_list, 4)
 
         task_input_layout = QHBoxLayout()
@@ -296,17 +471,25 @@ class ChecklistApp(QMainWindow):
         main_layout.addLayout(content_layout)
         self.setCentralWidget(main_widget)
 
-        # --- Populate project list and select first project if available ---
-        self._startup_refreshed = False
-        self.refresh_project_list()
-        self._startup_refreshed = True
+        # --- Undo for project deletion (status bar) ---
+        self._undo_delete_btn = QPushButton("Undo")
+        self._undo_delete_btn.setToolTip("Restore the deleted project")
+        self._undo_delete_btn.clicked.connect(self.undo_delete_project)
+        self._undo_delete_btn.hide()
+        self.statusBar().addPermanentWidget(self._undo_delete_btn)
+        self._undo_delete_timer = QTimer(self)
+        self._undo_delete_timer.setSingleShot(True)
+        self._undo_delete_timer.timeout.connect(self._commit_pending_delete)
 
-        from PyQt5.QtCore import QTimer
-        if self.project_list.count() > 0 and self.project_list.currentRow() == -1:
-            def select_and_load():
-                self.project_list.setCurrentRow(0)
-                self.load_project(0)
-            QTimer.singleShot(0, select_and_load)
+        # --- Progress of a progressive task table load (status bar) ---
+        self._load_progress = QProgressBar()
+        self._load_progress.setMaximumWidth(220)
+        self._load_progress.setFormat("Loading tasks %v/%m")
+        self._load_progress.hide()
+        self._load_progress_shown = 0
+        self.statusBar().addPermanentWidget(self._load_progress)
+        self.task_loader.progress.connect(self._on_load_progress)
+        self.task_loader.done.connect(self._load_progress.hide)
 
         # --- Apply theme after all widgets are created ---
         self.apply_theme()
@@ -318,7 +501,6 @@ class ChecklistApp(QMainWindow):
         return os.path.dirname(os.path.abspath(__file__))
 
     def open_custom_theme_dialog(self):
-        import os, json
         from custom_theme_dialog import CustomThemeDialog
         theme_params = [
             ("UIBackground", "Main background"),
@@ -335,416 +517,494 @@ class ChecklistApp(QMainWindow):
         param_values = {k: current_theme.get(k, "#ffffff") for k, _ in theme_params}
         dlg = CustomThemeDialog(self, theme_params, param_values, self.get_contrasting_font_color, self._themes_path)
         dlg.exec_()
-        # After dialog closes, reload themes and update dropdown
-        if os.path.exists(self._themes_path):
-            try:
-                with open(self._themes_path, 'r', encoding='utf-8') as f:
-                    all_themes = json.load(f)
-                if isinstance(all_themes, dict) and 'last_theme' in all_themes:
-                    self.last_theme = all_themes['last_theme']
-                self.themes = {k: v for k, v in all_themes.items() if k != 'last_theme'}
-                self.theme_combo.blockSignals(True)
-                self.theme_combo.clear()
-                self.theme_combo.addItems(list(self.themes.keys()))
-                # Restore last theme selection if possible
-                if self.last_theme and self.last_theme in self.themes:
-                    idx = list(self.themes.keys()).index(self.last_theme)
-                    self.theme_combo.setCurrentIndex(idx)
-                self.theme_combo.blockSignals(False)
-            except Exception:
-                pass
-        self.apply_theme()
+        # Re-read themes.json only if the dialog saved a theme (unchanged files are cached)
+        themes = self.theme_file.load()
+        if themes is not self.themes:
+            self.themes = themes
+            self._compiled_themes.clear()
+            selected = dlg.saved_theme or self.theme_combo.currentText()
+            self.theme_combo.blockSignals(True)
+            self.theme_combo.clear()
+            self.theme_combo.addItems(list(self.themes.keys()))
+            if selected in self.themes:
+                self.theme_combo.setCurrentIndex(list(self.themes.keys()).index(selected))
+            self.theme_combo.blockSignals(False)
+            self.apply_theme()
 
     def apply_theme(self):
         """
         Apply the selected theme to the main UI elements and persist the choice.
         """
-        import os, json
         theme_name = self.theme_combo.currentText() if hasattr(self, 'theme_combo') else 'Light'
         theme = self.themes.get(theme_name, self.themes.get('Light', {}))
-        # Set main window background
-        if 'UIBackground' in theme:
-            self.setStyleSheet(f"background-color: {theme['UIBackground']};")
-        # Set font color for main window
-        if 'FontColor' in theme:
-            self.setStyleSheet(self.styleSheet() + f" color: {theme['FontColor']};")
-        # Set project list background and font
-        if hasattr(self, 'project_list') and self.project_list is not None:
-            if 'TabBackground' in theme:
-                self.project_list.setStyleSheet(f"background-color: {theme['TabBackground']}; color: {theme.get('TabFontColor', '#222')};")
-        # Set button colors
-        if hasattr(self, 'findChildren'):
-            for btn in self.findChildren(QPushButton):
-                if 'ButtonBackground' in theme:
-                    btn.setStyleSheet(f"background-color: {theme['ButtonBackground']}; color: {theme.get('ButtonFontColor', '#222')};")
-
-        # Set QComboBox (dropdown) colors for sort and theme selectors
-        combo_bg = theme.get('TabBackground', '#e0e0e0')
-        combo_fg = theme.get('TabFontColor', '#222222')
-        combo_style = f"QComboBox {{ background-color: {combo_bg}; color: {combo_fg}; }} QComboBox QAbstractItemView {{ background-color: {combo_bg}; color: {combo_fg}; }}"
-        if hasattr(self, 'sort_combo'):
-            self.sort_combo.setStyleSheet(combo_style)
-        if hasattr(self, 'theme_combo'):
-            self.theme_combo.setStyleSheet(combo_style)
-        # Set project label font color
-        if hasattr(self, 'project_label') and 'FontColor' in theme:
-            self.project_label.setStyleSheet(f"color: {theme['FontColor']};")
-        # Set task input background and font
-        if hasattr(self, 'task_input'):
-            if 'UIBackground' in theme:
-                self.task_input.setStyleSheet(f"background-color: {theme['UIBackground']}; color: {theme.get('FontColor', '#222')};")
-        # Set task list header color
-        if hasattr(self, 'task_list'):
-            if 'TabBackground' in theme:
-                self.task_list.setStyleSheet(f"background-color: {theme['TabBackground']}; color: {theme.get('TabFontColor', '#222')};")
-            # Set QHeaderView (table header) background and font color
-            header = self.task_list.horizontalHeader()
-            tab_bg = theme.get('TabBackground', '#e0e0e0')
-            tab_fg = theme.get('TabFontColor', '#222222')
-            header.setStyleSheet(f"QHeaderView::section {{ background-color: {tab_bg}; color: {tab_fg}; }}")
-        # Update the project list to refresh favourite highlighting
-        if hasattr(self, 'project_list') and self.project_list is not None and hasattr(self, 'refresh_project_list'):
-            self.refresh_project_list(selected_project_id=getattr(self.current_project, 'id', None))
-
-        # --- Persist last selected theme in themes.json ---
-        if hasattr(self, '_themes_path') and os.path.exists(self._themes_path):
-            try:
-                with open(self._themes_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                if not isinstance(data, dict):
-                    data = {}
-                data['last_theme'] = theme_name
-                with open(self._themes_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-            except Exception:
-                pass
-
-        # --- Update all task rows to use new theme colors ---
-        if hasattr(self, 'task_list') and self.task_list.rowCount() > 0:
-            theme = self.themes.get(theme_name, self.themes.get('Light', {}))
-            for row in range(self.task_list.rowCount()):
-                # Update Task/Note cell
-                item = self.task_list.item(row, 2)
-                if item:
-                    # Try to get status from the status dropdown
-                    status_combo = self.task_list.cellWidget(row, 3)
-                    if status_combo:
-                        idx = status_combo.currentIndex()
-                        status = ["Done", "WIP", "Pending"][idx] if idx in [0,1,2] else "Pending"
-                    else:
-                        status = "Pending"
-                    bg_map = {
-                        "Pending": theme.get("PendingBackground", "#ffeaea"),
-                        "WIP": theme.get("WIPBackground", "#fff9e0"),
-                        "Done": theme.get("DoneBackground", "#eaffea")
-                    }
-                    bg_hex = bg_map.get(status, "#ffeaea")
-                    font_color = self.get_contrasting_font_color(bg_hex)
-                    from PyQt5.QtGui import QColor, QBrush
-                    item.setBackground(QBrush(QColor(bg_hex)))
-                    item.setForeground(QBrush(QColor(font_color)))
-                # Update status dropdown
-                status_combo = self.task_list.cellWidget(row, 3)
-                if status_combo:
-                    idx = status_combo.currentIndex()
-                    status = ["Done", "WIP", "Pending"][idx] if idx in [0,1,2] else "Pending"
-                    status_bg_map = {
-                        "Pending": theme.get("PendingBackground", "#e53935"),
-                        "WIP": theme.get("WIPBackground", "#fbc02d"),
-                        "Done": theme.get("DoneBackground", "#43a047")
-                    }
-                    status_bg = status_bg_map.get(status, "#e53935")
-                    status_font = self.get_contrasting_font_color(status_bg)
-                    # Style both the main box and the popup
-                    status_combo.setStyleSheet(
-                        f"QComboBox {{ background-color: {status_bg}; color: {status_font}; }} "
-                        f"QComboBox QAbstractItemView {{ background-color: {status_bg}; color: {status_font}; }}"
-                    )
-            self.task_list.viewport().update()
-            self.task_list.repaint()
+        # Compiled once per theme: one style sheet for the whole window and the status colors
+        compiled = self._compiled_themes.get(theme_name, theme)
+        if compiled.stylesheet != self.styleSheet():
+            self.setStyleSheet(compiled.stylesheet)
+
+        # --- Remember the selected theme (settings.json, written debounced) ---
+        if theme_name in self.themes:
+            self.settings.set('last_theme', theme_name)
+
+        # --- Update task row colors (painted from the model, no per-row widgets) ---
+        if hasattr(self, 'task_model'):
+            self.task_model.set_theme(compiled)
+
     def refresh_project_list(self, selected_project_id=None):
         # Only allow one refresh at startup
         if hasattr(self, '_startup_refreshed') and self._startup_refreshed and selected_project_id is None:
             return
         # Always reload projects from disk
         self.projects = self.load_all_projects()
+        # Reset the sidebar model (favourites first, then others, both sorted by name);
+        # single changes go through project_model's insert/move/remove instead
+        current_id = self.project_model.project_id_at(self.project_list.currentRow())
+        self.project_list.blockSignals(True)
+        self.project_model.set_projects(self.projects)
+        row = self.project_model.row_of(selected_project_id or current_id)
+        if row >= 0 and row != self.project_list.currentRow():
+            self.project_list.setCurrentRow(row)
+        self.project_list.blockSignals(False)
+        log.debug("Project list widget count after refresh: %d", self.project_list.count())
+        # Do not load the project here; handled by the callers
 
-        # --- FULLY REBUILD THE PROJECT LIST WIDGET ---
-        # Remove old widget from layout and delete it
-        parent_layout = self.project_list.parentWidget().layout() if self.project_list.parentWidget() else None
-        old_widget = self.project_list
-        if parent_layout:
-            parent_layout.removeWidget(old_widget)
-        old_widget.deleteLater()
-
-        # Create new QListWidget and reattach signals
-        from PyQt5.QtWidgets import QListWidget
-        self.project_list = QListWidget()
-        self.project_list.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.project_list.customContextMenuRequested.connect(self.open_project_context_menu)
-        self.project_list.currentRowChanged.connect(self.load_project)
-        if parent_layout:
-            parent_layout.insertWidget(1, self.project_list)  # index 1: after label
-
-        # Favourites first, then others, both sorted by name
-        favs = [p for p in self.projects if p.get('favourite', False)]
-        nonfavs = [p for p in self.projects if not p.get('favourite', False)]
-        favs.sort(key=lambda x: x['name'].lower())
-        nonfavs.sort(key=lambda x: x['name'].lower())
-        for proj in favs + nonfavs:
-            name = f"⭐ {proj['name']}" if proj.get('favourite', False) else proj['name']
-            item = QListWidgetItem(name)
-            item.setToolTip(proj['id'])
-            if proj.get('favourite', False):
-                from PyQt5.QtGui import QBrush, QColor
-                item.setBackground(QBrush(QColor(204, 153, 0)))  # dark yellow
-                item.setForeground(QBrush(QColor(255, 255, 255)))  # white font
-            self.project_list.addItem(item)
-        cprint(f"[DEBUG] Project list widget count after refresh: {self.project_list.count()}")
-        # Do not set selection or load project here; handled in delete_project
+    # --- External changes reported by the filesystem watcher ---
+    def _on_project_added(self, project_id):
+        if any(p['id'] == project_id for p in self.projects):
+            self._on_project_updated(project_id)
+            return
+        meta = self.storage.refresh_project(project_id)
+        if meta is None:
+            return
+        log.debug("Project added on disk: %s", project_id)
+        proj = {'id': meta['id'], 'name': meta['name'], 'favourite': meta.get('favourite', False)}
+        self.projects.append(proj)
+        self.project_model.add_project(proj)
+        self.search_index.request_sync(self.storage)
+
+    def _on_project_updated(self, project_id):
+        proj = next((p for p in self.projects if p['id'] == project_id), None)
+        if proj is None:
+            self._on_project_added(project_id)
+            return
+        meta = self.storage.refresh_project(project_id)
+        if meta is None:
+            self._on_project_removed(project_id)
+            return
+        if meta['name'] == proj['name'] and meta.get('favourite', False) == proj.get('favourite', False):
+            return
+        log.debug("Project changed on disk: %s", project_id)
+        proj['name'] = meta['name']
+        proj['favourite'] = meta.get('favourite', False)
+        # Move/restyle only this row; the selection follows it without reloading tasks
+        self.project_model.project_changed(project_id)
+        if self.current_project and self.current_project.id == project_id:
+            self.current_project.name = proj['name']
+            self.current_project.favourite = proj['favourite']
+            self.project_label.setText(f"Project: {proj['name']}")
+
+    def _on_project_removed(self, project_id):
+        if not any(p['id'] == project_id for p in self.projects):
+            return
+        log.debug("Project removed on disk: %s", project_id)
+        self.storage.refresh_project(project_id)
+        self.projects = [p for p in self.projects if p['id'] != project_id]
+        self.project_cache.invalidate(project_id)
+        self.search_index.remove_project(project_id)
+        row = self.project_model.row_of(project_id)
+        if row < 0:
+            return
+        was_current = row == self.project_list.currentRow()
+        self.project_list.blockSignals(True)
+        self.project_model.remove_project(project_id)
+        if was_current:
+            next_row = min(row, self.project_list.count() - 1)
+            self.project_list.setCurrentRow(next_row)
+        self.project_list.blockSignals(False)
+        if was_current:
+            self.load_project(self.project_list.currentRow())
+
+    def _on_tasks_changed(self, project_id, changes, removed):
+        """
+        Apply task records appended to the open project's journal by someone else.
+        Only the affected rows are updated; our own records are no-ops.
+        """
+        if not self.current_project or self.current_project.id != project_id:
+            return
+        project = self.current_project
+        # Removed tasks may not have been shown yet
+        self.task_loader.finish()
+        for task_id, fields in changes:
+            # A newer local change is still queued for this task; it wins
+            if self.storage.has_pending(project_id, task_id):
+                continue
+            task = project.get_task(task_id)
+            if task is None:
+                if 'text' in fields:
+                    fields['id'] = task_id
+                    task = project.add_task(Task.from_dict(fields))
+                    self.place_task_row(task)
+                    self.search_index.index_task(project_id, task_id, task.text)
+                continue
+            if not project.update_task(task_id, fields):
+                continue
+            if 'text' in fields:
+                self.search_index.index_task(project_id, task_id, task.text)
+            self.place_task_row(task)
+        for task_id in removed:
+            if self.storage.has_pending(project_id, task_id):
+                continue
+            if project.remove_task(task_id) is not None:
+                self.task_model.remove_task(task_id)
+                self.search_index.remove_task(project_id, task_id)
+        # The in-memory project now matches the disk again
+        self.project_cache.revalidate(project_id, self.storage.project_version(project_id))
+
+    def _on_tasks_reset(self, project_id):
+        if self.current_project and self.current_project.id == project_id:
+            log.debug("Journal of %s was rewritten on disk, reloading", project_id)
+            self.project_cache.invalidate(project_id)
+            self.load_project_by_id(project_id)
+            self.search_index.request_sync(self.storage)
 
     def load_project_by_id(self, project_id):
-        import os, json
-        import datetime
-        # Always reload project metadata from disk
-        projects_dir = os.path.join(self.get_base_path(), 'projects')
-        project_path = os.path.join(projects_dir, f"{project_id}.json")
-        if os.path.exists(project_path):
-            try:
-                with open(project_path, 'r', encoding='utf-8') as f:
-                    proj = json.load(f)
-                self.current_project = proj
-                self.project_label.setText(f"Project: {proj['name']}")
-                self.task_list.setRowCount(0)
-                # Load tasks from tasks/<project_id>/
-                tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_id)
-                tasks = []
-                if os.path.exists(tasks_dir):
-                    for fname in sorted(os.listdir(tasks_dir)):
-                        if fname.endswith('.json'):
-                            fpath = os.path.join(tasks_dir, fname)
-                            try:
-                                with open(fpath, 'r', encoding='utf-8') as f:
-                                    task = json.load(f)
-                                    if 'order' not in task:
-                                        task['order'] = 0
-                                    # Add created field if missing (use file creation time)
-                                    if 'created' not in task:
-                                        try:
-                                            stat = os.stat(fpath)
-                                            task['created'] = stat.st_ctime
-                                        except Exception:
-                                            task['created'] = 0
-                                    tasks.append(task)
-                            except Exception:
-                                pass
-                self.current_project['tasks'] = tasks
-                self.display_tasks()
-                return
-            except Exception:
-                pass
-        # If not found
+        # A rebalance scheduled for the project being left is done now
+        if self._rebalance_timer.isActive():
+            self.rebalance_task_orders()
+        # Use the cached project while it is unchanged on disk, else load it in the background
+        try:
+            proj = self.project_cache.get(project_id, self.storage.project_version)
+        except Exception as e:
+            log.warning("Failed to load project %s: %s", project_id, e)
+            self._show_no_project()
+            return
+        if proj is not None:
+            log.debug("Project %s served from cache", project_id)
+            self._loading_project = None
+            self._show_project(proj, loaded=False)
+            return
+        if self._loading_project == project_id:
+            return
+        self._loading_project = project_id
+        # Stop following the journal the loader is about to read; a project that is reloaded
+        # (changed on disk, or the startup snapshot) stays on screen until its load arrives
+        if self.watcher is not None:
+            self.watcher.watch_project(None)
+        if self.current_project is None or self.current_project.id != project_id:
+            self.task_loader.cancel()
+            self.current_project = None
+            name = next((p['name'] for p in self.projects if p['id'] == project_id), project_id)
+            self.project_label.setText(f"Project: {name} (loading…)")
+            self.task_model.clear()
+            self._load_progress.setMaximum(0)
+            self._load_progress.show()
+        self.project_loader.request(project_id, self.sort_mode())
+
+    def _on_project_loaded(self, project_id, proj, version):
+        if proj is not None:
+            self.project_cache.put(project_id, proj, version)
+        # A later switch superseded this load (the project stays cached for when it is reopened)
+        if project_id != self._loading_project:
+            return
+        self._loading_project = None
+        self._load_progress.hide()
+        if proj is None:
+            self._show_no_project()
+        else:
+            self._show_project(proj, loaded=True)
+
+    def _on_project_load_failed(self, project_id, message):
+        log.warning("Failed to load project %s: %s", project_id, message)
+        if project_id != self._loading_project:
+            return
+        self._load_progress.hide()
+        self._show_no_project()
+
+    def _show_project(self, proj, loaded):
+        """
+        Make proj the open project and show its tasks. With loaded, it was just read from disk
+        and the watcher tails the journal from where that read stopped.
+        """
+        if self.watcher is not None:
+            self.watcher.watch_project(proj.id, from_load=loaded)
+        self.current_project = proj
+        self.settings.set('selected_project', proj.id)
+        self.project_label.setText(f"Project: {proj.name}")
+        self.task_model.clear()
+        self.display_tasks()
+        if self._reveal_task is not None:
+            project_id, task_id = self._reveal_task
+            self._reveal_task = None
+            if project_id == proj.id:
+                self.reveal_task(task_id)
+
+    def _show_no_project(self):
+        self._loading_project = None
         self.current_project = None
         self.project_label.setText("No project selected")
-        self.task_list.setRowCount(0)
+        self.task_model.clear()
 
     def display_tasks(self):
         # Display tasks in the order selected by the sort combo
-        if not self.current_project or 'tasks' not in self.current_project:
-            self.task_list.setRowCount(0)
+        if not self.current_project:
+            self.task_model.clear()
             return
-        tasks = self.current_project['tasks']
-        mode = self.sort_combo.currentText() if hasattr(self, 'sort_combo') else 'Status'
-        if mode == 'Status':
-            # Sort by status: Pending, WIP, Done (then by order field)
-            status_order = {'Pending': 0, 'WIP': 1, 'Done': 2}
-            tasks = sorted(tasks, key=lambda t: (status_order.get(t.get('status', 'Pending'), 3), t.get('order', 0)))
-        elif mode == 'Alphanumeric':
-            tasks = sorted(tasks, key=lambda t: t.get('text', '').lower())
-        elif mode == 'Oldest':
-            # Sort by creation timestamp (true chronological order)
-            tasks = sorted(tasks, key=lambda t: t.get('created', 0))
-        self.task_list.setRowCount(0)
-        for task in tasks:
-            self.add_task_row(task)
+        # The project keeps each sort order up to date, so this is only sorted on first use
+        order = self.current_project.ordered(self.sort_mode())
+        first_rows = len(order)
+        if first_rows >= self.PROGRESSIVE_LOAD_MIN:
+            # A screenful (at the minimum row height) now, the rest while the app is idle
+            first_rows = max(100, 2 * self.task_list.viewport().height() // 40)
+        self.task_loader.start(order, first_rows)
+
+    def _on_load_progress(self, shown, total):
+        import time
+        # setValue() repaints synchronously, which costs more than appending a chunk: throttle it
+        now = time.monotonic()
+        if self._load_progress.isVisible() and now - self._load_progress_shown < 0.1:
+            return
+        self._load_progress_shown = now
+        self._load_progress.setMaximum(total)
+        self._load_progress.setValue(shown)
+        self._load_progress.show()
+
+    def sort_mode(self):
+        return self.sort_combo.currentText() if hasattr(self, 'sort_combo') else 'Status'
+
+    def place_task_row(self, task):
+        """
+        Show a new or changed task in the row its sort order puts it in: one row is inserted,
+        moved or repainted, the rest of the table is left alone.
+        """
+        # Sorted positions are only valid once every row is in the table
+        self.task_loader.finish()
+        row = self.current_project.ordered(self.sort_mode()).row_of(task.id)
+        current = self.task_model.row_of(task.id)
+        if current < 0:
+            self.task_model.insert_task(row, task)
+        elif current != row:
+            self.task_model.move_task(task.id, row)
+        else:
+            # Update the table cell (re-wrapped lazily) and re-fit its height
+            self.task_model.task_changed(row)
+            self._sized_rows.discard(row)
+            self._resize_timer.start(0)
+
+    def apply_task_filter(self):
+        self._filter_timer.stop()
+        self.task_filter.set_query(self.filter_input.text())
+        # Rows that became visible may not have been measured yet
+        self._resize_timer.start(0)
 
     def sort_tasks_by_mode(self):
-        self.display_tasks()
+        # Same tasks, another order: permute the existing rows instead of rebuilding them
+        self.task_model.set_drag_enabled(self.sort_mode() == MANUAL_SORT)
+        self.settings.set('sort_mode', self.sort_mode())
+        if not self.current_project:
+            return
+        if self.task_loader.is_loading():
+            # Not all rows are there to permute: restart the load in the new order
+            self.display_tasks()
+            return
+        self.task_model.reorder(self.current_project.ordered(self.sort_mode()))
 
-    def load_project_by_name(self, project_name):
-        import os, json
-        # Find project in self.projects
-        for idx, proj in enumerate(self.projects):
-            if proj['name'] == project_name:
-                self.current_project = self.projects[idx]
-                self.project_label.setText(f"Project: {self.current_project['name']}")
-                self.task_list.setRowCount(0)
-                # Load tasks from tasks/<project_name>/
-                tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_name)
-                tasks = []
-                if os.path.exists(tasks_dir):
-                    for fname in sorted(os.listdir(tasks_dir)):
-                        if fname.endswith('.json'):
-                            fpath = os.path.join(tasks_dir, fname)
-                            try:
-                                with open(fpath, 'r', encoding='utf-8') as f:
-                                    task = json.load(f)
-                                    tasks.append(task)
-                            except Exception:
-                                pass
-                self.current_project['tasks'] = tasks
-                for task in tasks:
-                    self.add_task_row(task)
-                return
-        # If not found
-        self.current_project = None
-        self.project_label.setText("No project selected")
-        self.task_list.setRowCount(0)
+    def move_task(self, task_id, row):
+        """
+        A task row was dragged to row (Status sort). The task gets a rank between its new
+        neighbours, and joins their status group, so only this one task is written.
+        """
+        project = self.current_project
+        if not project or task_id not in project:
+            return
+        placement = project.rank_for_move(task_id, row)
+        if placement is None:
+            return
+        status, rank = placement
+        if rank is None:
+            # The neighbours' ranks are too close to split: respace them all first
+            self.rebalance_task_orders()
+            status, rank = project.rank_for_move(task_id, row)
+        task = project.get_task(task_id)
+        fields = {key: value for key, value in (('status', status), ('order', rank)) if getattr(task, key) != value}
+        if not fields:
+            return
+        project.update_task(task_id, fields)
+        self.storage.update_task(project.id, task_id, **fields)
+        self.place_task_row(task)
+        if project.is_crowded(task_id):
+            self._rebalance_timer.start()
 
-    def load_project(self, idx):
-        if idx < 0 or idx >= self.project_list.count():
-            self.current_project = None
-            self.project_label.setText("No project selected")
-            self.task_list.setRowCount(0)
+    def rebalance_task_orders(self):
+        """
+        Respace the ranks of the open project's tasks (ORDER_GAP apart) and save the changed
+        tasks in one batch, which the write-behind worker writes in the background.
+        The display order does not change.
+        """
+        self._rebalance_timer.stop()
+        project = self.current_project
+        if not project:
+            return
+        changed = project.rebalance_orders()
+        if changed:
+            log.debug("Rebalanced the order of %d tasks in %s", len(changed), project.id)
+            self.storage.save_tasks(project.id, [t.to_dict() for t in changed])
+
+    def _invalidate_row_sizes(self, *args):
+        self._sized_rows.clear()
+        self._resize_timer.start(0)
+
+    def _on_task_column_resized(self, column, old_width, new_width):
+        # Wrapping only changes when the width crosses into another width bucket
+        if column == COL_TEXT and self._wrap_cache.bucket(self._wrap_width(old_width)) != self._wrap_cache.bucket(self._wrap_width(new_width)):
+            self.task_model.invalidate_wrapping()
+            self._invalidate_row_sizes()
+
+    def _resize_visible_rows(self):
+        """
+        Fit the height of the rows currently in the viewport to their wrapped text.
+        Rows outside the viewport keep the default height until they are scrolled into view.
+        Heights come from the model's cached text layouts and are applied in one batch.
+        """
+        row_count = self.task_model.rowCount()
+        if row_count == 0:
             return
-        item = self.project_list.item(idx)
-        if not item:
+        first = max(0, self.task_list.rowAt(0))
+        bottom = self.task_list.viewport().height()
+        position = self.task_list.rowViewportPosition(first)
+        heights = {}
+        row = first
+        while row < row_count and position <= bottom:
+            if not self.task_list.isRowHidden(row):
+                if row in self._sized_rows:
+                    height = self.task_list.rowHeight(row)
+                else:
+                    height = heights[row] = self.task_model.row_height(row)
+                position += height
+            row += 1
+        # Before resizing: the new heights can show the scrollbar, narrowing the column, which
+        # re-wraps and clears _sized_rows again
+        self._sized_rows.update(heights)
+        resize_rows(self.task_list, heights)
+
+    def closeEvent(self, event):
+        # Flushes queued task writes and settings before exiting
+        self.settings.set('window_geometry', bytes(self.saveGeometry().toBase64()).decode('ascii'))
+        self.settings.flush()
+        # Stop a running index sync and project load before the storage they read is closed; the
+        # index itself stays open for the version updates of the last writes
+        self.search_index.stop()
+        self.project_loader.stop()
+        self.storage.close()
+        self._save_snapshot()
+        self.search_index.close()
+        super().closeEvent(event)
+
+    # --- Search ---
+    def run_search(self):
+        self._search_timer.stop()
+        query = self.search_input.text().strip()
+        self.search_results.clear()
+        if not query:
+            self.search_results.hide()
             return
-        project_id = item.toolTip()
-        self.load_project_by_id(project_id)
+        names = {p['id']: p['name'] for p in self.projects}
+        mode = self.search_mode.currentText()
+        try:
+            if mode == "Substring":
+                hits = self.search_index.search_substring(query, limit=100)
+            elif mode == "Regex":
+                hits = self.search_index.search_regex(query, limit=100)
+            else:
+                hits = self.search_index.search(query, limit=100)
+        except (ValueError, re.error) as e:
+            self.search_results.addItem(QListWidgetItem(str(e)))
+            self.search_results.show()
+            return
+        truncated = getattr(hits, 'truncated', False)
+        # Projects in the trash (pending undo) are still indexed; only show live ones
+        hits = [h for h in hits if h['project_id'] in names]
+        for hit in hits:
+            first_line = hit['text'].strip().splitlines()[0] if hit['text'].strip() else ''
+            item = QListWidgetItem(f"{names[hit['project_id']]}: {first_line[:80]}")
+            item.setToolTip(hit['text'])
+            item.setData(Qt.UserRole, (hit['project_id'], hit['task_id']))
+            self.search_results.addItem(item)
+        if not hits:
+            self.search_results.addItem(QListWidgetItem("No matches"))
+        elif truncated:
+            self.search_results.addItem(QListWidgetItem(
+                f"Too many matches: only the {SearchIndex.MAX_CANDIDATES} newest were ranked; add words to narrow the search"))
+        self.search_results.show()
 
+    def open_search_result(self, item):
+        target = item.data(Qt.UserRole)
+        if not target:
+            return
+        project_id, task_id = target
+        row = self.project_model.row_of(project_id)
+        if row < 0:
+            return
+        if row != self.project_list.currentRow():
+            self.project_list.setCurrentRow(row)
+        if self.current_project is not None and self.current_project.id == project_id:
+            self.reveal_task(task_id)
+        else:
+            # Selected once the project's load arrives
+            self._reveal_task = (project_id, task_id)
 
+    def reveal_task(self, task_id):
+        self.task_loader.finish()
+        task_row = self.task_model.row_of(task_id)
+        if task_row >= 0:
+            index = self.task_model.index(task_row, COL_TEXT)
+            self.task_list.scrollTo(index, QAbstractItemView.PositionAtCenter)
+            self.task_list.selectRow(task_row)
 
+    def _on_write_failed(self, message):
+        """
+        Report a failed background save. Unsaved changes stay queued and are retried.
+        """
+        log.warning("Background save failed: %s", message)
+        self.statusBar().showMessage(f"Saving failed, retrying: {message}", 10000)
+        if not self._write_error_shown:
+            self._write_error_shown = True
+            QMessageBox.warning(self, "Save Failed", f"Could not save changes:\n{message}\n\nThe app will keep retrying in the background.")
 
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if hasattr(self, '_resize_timer'):
+            self._resize_timer.start(0)
 
-    # Duplicate init_ui removed. Only the first definition remains.
-
-    def load_project_by_name(self, project_name):
-        import os, json
-        # Find project in self.projects
-        for idx, proj in enumerate(self.projects):
-            if proj['name'] == project_name:
-                self.current_project = self.projects[idx]
-                self.project_label.setText(f"Project: {self.current_project['name']}")
-                self.task_list.setRowCount(0)
-                # Load tasks from tasks/<project_name>/
-                tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_name)
-                tasks = []
-                if os.path.exists(tasks_dir):
-                    for fname in sorted(os.listdir(tasks_dir)):
-                        if fname.endswith('.json'):
-                            fpath = os.path.join(tasks_dir, fname)
-                            try:
-                                with open(fpath, 'r', encoding='utf-8') as f:
-                                    task = json.load(f)
-                                    tasks.append(task)
-                            except Exception:
-                                pass
-                self.current_project['tasks'] = tasks
-                for task in tasks:
-                    self.add_task_row(task)
-                return
-        # If not found
-        self.current_project = None
-        self.project_label.setText("No project selected")
-        self.task_list.setRowCount(0)
+    def load_project(self, idx):
+        if idx < 0 or idx >= self.project_list.count():
+            self._show_no_project()
+            return
+        project_id = self.project_model.project_id_at(idx)
+        if project_id is None:
+            return
+        self.load_project_by_id(project_id)
 
     def add_task(self):
-        import os, json, uuid, time
+        import uuid, time
         if not self.current_project:
             QMessageBox.warning(self, "No Project", "Please select or create a project first.")
             return
         text = self.task_input.toPlainText().strip()
         if text:
-            task_id = str(uuid.uuid4())
-            tasks = self.current_project.get('tasks', [])
-            next_order = max([t.get('order', i) for i, t in enumerate(tasks)], default=-1) + 1
-            created_ts = time.time()
-            task = {"id": task_id, "text": text, "status": "Pending", "order": next_order, "created": created_ts}
-            self.current_project['tasks'].append(task)
-            self.add_task_row(task)
-            # Save task as file
-            project_id = self.current_project['id']
-            tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_id)
-            os.makedirs(tasks_dir, exist_ok=True)
-            fpath = os.path.join(tasks_dir, f"{task_id}.json")
-            with open(fpath, 'w', encoding='utf-8') as f:
-                json.dump(task, f, indent=2, ensure_ascii=False)
+            task = Task(str(uuid.uuid4()), text, "Pending", self.current_project.next_order(), time.time())
+            self.current_project.add_task(task)
+            self.place_task_row(task)
+            self.storage.save_task(self.current_project.id, task.to_dict())
+            self.search_index.index_task(self.current_project.id, task.id, task.text)
             self.task_input.clear()
 
-    def add_task_row(self, task):
-        from PyQt5.QtGui import QColor, QBrush
-        row = self.task_list.rowCount()
-        self.task_list.insertRow(row)
-        # Delete button
-        del_btn = QPushButton()
-        del_btn.setText("❌")
-        del_btn.setToolTip("Delete task")
-        del_btn.clicked.connect(lambda _, r=row: self.delete_task(r))
-        self.task_list.setCellWidget(row, 0, del_btn)
-        # Edit button
-        edit_btn = QPushButton()
-        edit_btn.setText("✏️")
-        edit_btn.setToolTip("Edit task")
-        edit_btn.clicked.connect(lambda _, r=row: self.edit_task(r))
-        self.task_list.setCellWidget(row, 1, edit_btn)
-        # Task text with visual wrap marker
-        raw_text = task["text"] if isinstance(task, dict) else task
-        display_text = self._wrap_with_marker(raw_text, marker='↪ ')
-        item = QTableWidgetItem(display_text)
-        item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        item.setFlags(item.flags() | Qt.ItemIsEditable)
-        # Enable word wrap for the Task/Note cell
-        item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        item.setData(Qt.TextWordWrap, True)
-        # Store task ID in the item for robust status update
-        if isinstance(task, dict) and "id" in task:
-            item.setData(Qt.UserRole, task["id"])
-        # Set background color and font color based on status and theme
-        status = task["status"] if isinstance(task, dict) and "status" in task else "Pending"
-        theme = self.themes.get(self.theme_combo.currentText(), self.themes.get('Light', {}))
-        bg_map = {
-            "Pending": theme.get("PendingBackground", "#ffeaea"),
-            "WIP": theme.get("WIPBackground", "#fff9e0"),
-            "Done": theme.get("DoneBackground", "#eaffea")
-        }
-        bg_hex = bg_map.get(status, "#ffeaea")
-        font_color = self.get_contrasting_font_color(bg_hex)
-        item.setBackground(QBrush(QColor(bg_hex)))
-        item.setForeground(QBrush(QColor(font_color)))
-        self.task_list.setItem(row, 2, item)
-        # Force row height to fit contents (word wrap)
-        self.task_list.resizeRowToContents(row)
-        # For very long lines, ensure a minimum height for visibility
-        min_height = 40
-        if self.task_list.rowHeight(row) < min_height:
-            self.task_list.setRowHeight(row, min_height)
-        # Status dropdown
-        status_combo = QComboBox()
-        status_combo.addItem("Done")
-        status_combo.addItem("WIP")
-        status_combo.addItem("Pending")
-        status_map = {"Done": 0, "WIP": 1, "Pending": 2}
-        status_combo.setCurrentIndex(status_map.get(status, 2))
-        # Set color for status button (background and font), including popup
-        status_bg_map = {
-            "Pending": theme.get("PendingBackground", "#e53935"),
-            "WIP": theme.get("WIPBackground", "#fbc02d"),
-            "Done": theme.get("DoneBackground", "#43a047")
-        }
-        status_bg = status_bg_map.get(status, "#e53935")
-        status_font = self.get_contrasting_font_color(status_bg)
-        status_combo.setStyleSheet(
-            f"QComboBox {{ background-color: {status_bg}; color: {status_font}; }} "
-            f"QComboBox QAbstractItemView {{ background-color: {status_bg}; color: {status_font}; }}"
-        )
-        status_combo.currentIndexChanged.connect(lambda idx, r=row: self.update_status(r, idx))
-        self.task_list.setCellWidget(row, 3, status_combo)
     def handle_table_click(self, row, col):
         if col == 0:
             self.delete_task(row)
         elif col == 1:
             self.edit_task(row)
+        elif col == COL_STATUS:
+            self.task_list.edit(self.task_model.index(row, col))
 
     def open_context_menu(self, pos):
         from PyQt5.QtWidgets import QMenu
@@ -762,20 +1022,12 @@ class ChecklistApp(QMainWindow):
             self.delete_task(row)
 
     def edit_task(self, row):
-        import os, json
         from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QPushButton, QHBoxLayout, QLabel
         if not self.current_project:
             return
-        # Get the task ID from the table row
-        item = self.task_list.item(row, 2)
-        task_id = item.data(Qt.UserRole) if item else None
-        # Find the correct task in self.current_project['tasks'] by ID
-        task = None
-        for t in self.current_project['tasks']:
-            if t.get('id') == task_id:
-                task = t
-                break
-        if not task:
+        # Rows are mapped to task ids, so this is the task shown in that row whatever the sort order
+        task = self.current_project.get_task(self.task_model.task_id_at(row))
+        if task is None:
             return
         # Multi-line edit dialog
         class EditDialog(QDialog):
@@ -799,136 +1051,69 @@ class ChecklistApp(QMainWindow):
                 cancel_btn.clicked.connect(self.reject)
             def getText(self):
                 return self.text_edit.toPlainText()
-        dlg = EditDialog(task["text"], self)
+        dlg = EditDialog(task.text, self)
         if dlg.exec_() == QDialog.Accepted:
             new_text = dlg.getText().strip()
             if new_text:
-                task["text"] = new_text
-                # Update the table cell with wrap marker
-                display_text = self._wrap_with_marker(new_text, marker='↪ ')
-                self.task_list.item(row, 2).setText(display_text)
-                # Re-adjust row height to fit new content
-                self.task_list.resizeRowToContents(row)
-                # Save updated task file
-                project_id = self.current_project['id']
-                tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_id)
-                fpath = os.path.join(tasks_dir, f"{task['id']}.json")
-                with open(fpath, 'w', encoding='utf-8') as f:
-                    json.dump(task, f, indent=2, ensure_ascii=False)
+                self.current_project.update_task(task.id, {'text': new_text})
+                self.place_task_row(task)
+                self.storage.save_task(self.current_project.id, task.to_dict())
+                self.search_index.index_task(self.current_project.id, task.id, task.text)
 
     def delete_task(self, row):
-        import os
         if not self.current_project:
             return
-        task = self.current_project['tasks'].pop(row)
-        self.task_list.removeRow(row)
-        # Delete task file
-        project_id = self.current_project['id']
-        tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_id)
-        fpath = os.path.join(tasks_dir, f"{task['id']}.json")
-        if os.path.exists(fpath):
-            os.remove(fpath)
+        # Rows follow the display order, so remove the task the row shows (by id, not tasks[row])
+        task_id = self.task_model.task_id_at(row)
+        if task_id is None or self.current_project.remove_task(task_id) is None:
+            return
+        self.task_model.remove_task(task_id)
+        self.storage.delete_task(self.current_project.id, task_id)
+        self.search_index.remove_task(self.current_project.id, task_id)
 
     def update_status(self, row, idx):
-        import os, json
-        from PyQt5.QtGui import QColor, QBrush
         if not self.current_project:
             return
-        status = ["Done", "WIP", "Pending"][idx]
-        # Get the task ID from the table row
-        item = self.task_list.item(row, 2)
-        task_id = item.data(Qt.UserRole) if item else None
-        # Find the correct task in self.current_project['tasks'] by ID
-        task = None
-        for t in self.current_project['tasks']:
-            if t.get('id') == task_id:
-                task = t
-                break
-        if not task:
+        status = STATUSES[idx]
+        task = self.current_project.get_task(self.task_model.task_id_at(row))
+        if task is None:
             return
-        task["status"] = status
-        # Save updated status to file
-        project_id = self.current_project['id']
-        tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_id)
-        fpath = os.path.join(tasks_dir, f"{task['id']}.json")
-        with open(fpath, 'w', encoding='utf-8') as f:
-            json.dump(task, f, indent=2, ensure_ascii=False)
-
-        # Update Task/Note cell background and font color
-        if item:
-            theme = self.themes.get(self.theme_combo.currentText(), self.themes.get('Light', {}))
-            bg_map = {
-                "Pending": theme.get("PendingBackground", "#ffeaea"),
-                "WIP": theme.get("WIPBackground", "#fff9e0"),
-                "Done": theme.get("DoneBackground", "#eaffea")
-            }
-            bg_hex = bg_map.get(status, "#ffeaea")
-            font_color = self.get_contrasting_font_color(bg_hex)
-            item.setBackground(QBrush(QColor(bg_hex)))
-            item.setForeground(QBrush(QColor(font_color)))
-
-        # Update status dropdown color and font
-        status_combo = self.task_list.cellWidget(row, 3)
-        if status_combo:
-            status_bg_map = {
-                "Pending": theme.get("PendingBackground", "#e53935"),
-                "WIP": theme.get("WIPBackground", "#fbc02d"),
-                "Done": theme.get("DoneBackground", "#43a047")
-            }
-            status_bg = status_bg_map.get(status, "#e53935")
-            status_font = self.get_contrasting_font_color(status_bg)
-            # Set popup color to match main color for instant feedback
-            status_combo.setStyleSheet(
-                f"QComboBox {{ background-color: {status_bg}; color: {status_font}; }} "
-                f"QComboBox QAbstractItemView {{ background-color: {status_bg}; color: {status_font}; }}"
-            )
-
-        # Force repaint for instant color update
-        self.task_list.viewport().update()
-        self.task_list.repaint()
+        self.current_project.update_task(task.id, {'status': status})
+        # A status flip only updates the status field (a small journal append / single-column update)
+        self.storage.update_task(self.current_project.id, task.id, status=status)
+        # Repaint the row with the new status colors (in Status mode it moves to its new group)
+        self.place_task_row(task)
 
     def new_project(self):
         from PyQt5.QtWidgets import QInputDialog
-        import os, json
-        # Ensure 'projects' folder exists
-        projects_dir = os.path.join(self.get_base_path(), 'projects')
-        os.makedirs(projects_dir, exist_ok=True)
         # Ask for project name
         project_name, ok = QInputDialog.getText(self, "New Project", "Enter project name:")
         if ok and project_name.strip():
             project_name = project_name.strip()
             # Generate unique 12-char alphanumeric ID
+            import random, string
             def gen_id():
                 return ''.join(random.choices(string.ascii_letters + string.digits, k=12))
             project_id = gen_id()
-            # Save project file as <id>.json
-            project_path = os.path.join(projects_dir, f"{project_id}.json")
             # Ensure ID is unique (very unlikely to collide, but check)
-            while os.path.exists(project_path):
+            while self.storage.project_exists(project_id):
                 project_id = gen_id()
-                project_path = os.path.join(projects_dir, f"{project_id}.json")
-            # Create tasks/<project_id>/ folder
-            tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_id)
-            os.makedirs(tasks_dir, exist_ok=True)
-            # Add default 'Project Created' task
-            import uuid
-            task_id = str(uuid.uuid4())
-            default_task = {"id": task_id, "text": "Project Created", "status": "Done"}
-            fpath = os.path.join(tasks_dir, f"{task_id}.json")
-            with open(fpath, 'w', encoding='utf-8') as f:
-                json.dump(default_task, f, indent=2, ensure_ascii=False)
             # Save project metadata (with favourite False)
             project_meta = {'id': project_id, 'name': project_name, 'favourite': False}
-            with open(project_path, 'w', encoding='utf-8') as f:
-                json.dump(project_meta, f, indent=2, ensure_ascii=False)
-            new_proj = {'id': project_id, 'name': project_name, 'favourite': False, 'tasks': [default_task]}
+            self.storage.save_project(project_meta)
+            # The index knows the project from here on; the write below advances its token
+            self.search_index.add_project(project_id, self.storage.project_version(project_id))
+            # Add default 'Project Created' task
+            import uuid, time
+            task_id = str(uuid.uuid4())
+            default_task = Task(task_id, "Project Created", "Done", 0, time.time())
+            self.storage.save_task(project_id, default_task.to_dict())
+            self.search_index.index_task(project_id, default_task.id, default_task.text)
+            new_proj = {'id': project_id, 'name': project_name, 'favourite': False}
             self.projects.append(new_proj)
-            # Add to project list widget (not favourites)
-            item = QListWidgetItem(project_name)
-            item.setToolTip(project_id)
-            self.project_list.addItem(item)
+            # Add to the project list at its sorted position (not favourites)
+            row = self.project_model.add_project(new_proj)
             # Select the new project and load its (empty) task/note area
-            row = self.project_list.count() - 1
             self.project_list.setCurrentRow(row)
             self.load_project_by_id(project_id)
 
@@ -939,8 +1124,7 @@ class ChecklistApp(QMainWindow):
         if row < 0:
             return
         menu = QMenu()
-        item = self.project_list.item(row)
-        project_id = item.toolTip()
+        project_id = self.project_model.project_id_at(row)
         proj = next((p for p in self.projects if p['id'] == project_id), None)
         if proj and proj.get('favourite', False):
             fav_action = menu.addAction("Un-favourite")
@@ -956,159 +1140,126 @@ class ChecklistApp(QMainWindow):
         elif action == del_action:
             self.confirm_delete_project(project_id, favourite=proj.get('favourite', False))
 
-    def open_fav_context_menu(self, pos):
-        from PyQt5.QtWidgets import QMenu
-        idx = self.fav_list.indexAt(pos)
-        row = idx.row()
-        if row < 0:
-            return
-        menu = QMenu()
-        unfav_action = menu.addAction("Un-favourite")
-        del_action = menu.addAction("Delete")
-        action = menu.exec_(self.fav_list.viewport().mapToGlobal(pos))
-        item = self.fav_list.item(row)
-        project_id = item.toolTip()
-        if action == unfav_action:
-            self.remove_from_favourites(project_id)
-        elif action == del_action:
-            self.confirm_delete_project(project_id, favourite=True)
-
     def add_to_favourites(self, project_id):
-        import os, json
         proj = next((p for p in self.projects if p['id'] == project_id), None)
         if proj and not proj.get('favourite', False):
             proj['favourite'] = True
-            # Update project file
-            projects_dir = os.path.join(self.get_base_path(), 'projects')
-            project_path = os.path.join(projects_dir, f"{project_id}.json")
-            with open(project_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            data['favourite'] = True
-            with open(project_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            self.refresh_project_list(selected_project_id=project_id)
+            self.storage.update_project(project_id, favourite=True)
+            # Moves just this row; it stays selected if it was
+            self.project_model.project_changed(project_id)
 
     def remove_from_favourites(self, project_id):
-        import os, json
         proj = next((p for p in self.projects if p['id'] == project_id), None)
         if proj and proj.get('favourite', False):
             proj['favourite'] = False
-            # Update project file
-            projects_dir = os.path.join(self.get_base_path(), 'projects')
-            project_path = os.path.join(projects_dir, f"{project_id}.json")
-            with open(project_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            data['favourite'] = False
-            with open(project_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            self.refresh_project_list(selected_project_id=project_id)
+            self.storage.update_project(project_id, favourite=False)
+            self.project_model.project_changed(project_id)
 
     def confirm_delete_project(self, project_id, favourite=False):
         proj = next((p for p in self.projects if p['id'] == project_id), None)
         pname = proj['name'] if proj else project_id
-        reply = QMessageBox.question(self, "Delete Project", f"Are you sure you want to delete project '{pname}'? This cannot be undone.", QMessageBox.Yes | QMessageBox.No)
+        reply = QMessageBox.question(self, "Delete Project", f"Are you sure you want to delete project '{pname}'? You can undo this for a few seconds.", QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
             self.delete_project(project_id, favourite)
 
     def delete_project(self, project_id, favourite):
-        import os, shutil
         # Find the row of the project to be deleted
-        row_to_delete = None
+        row_to_delete = self.project_model.row_of(project_id)
         next_project_id = None
-        for i in range(self.project_list.count()):
-            item = self.project_list.item(i)
-            if item and item.toolTip() == project_id:
-                row_to_delete = i
-                # Try to select the next project after deletion
-                if self.project_list.count() > 1:
-                    # Prefer next project, else previous
-                    if i + 1 < self.project_list.count():
-                        next_item = self.project_list.item(i + 1)
-                    else:
-                        next_item = self.project_list.item(i - 1)
-                    if next_item:
-                        next_project_id = next_item.toolTip()
-                break
-        cprint(f"[DEBUG] delete_project called for project_id: {project_id}")
-        # Remove from self.projects
+        # Try to select the next project after deletion (prefer next project, else previous)
+        if row_to_delete >= 0 and self.project_list.count() > 1:
+            next_project_id = self.project_model.project_id_at(row_to_delete + 1 if row_to_delete + 1 < self.project_list.count() else row_to_delete - 1)
+        log.debug("delete_project called for project_id: %s", project_id)
+        # Only the most recent deletion can be undone; hand an earlier one to the reclaimer now
+        self._commit_pending_delete()
+        proj = next((p for p in self.projects if p['id'] == project_id), None)
+        pname = proj['name'] if proj else project_id
+        # Stop showing and watching the project before its files are moved
+        was_open = ((self.current_project is not None and self.current_project.id == project_id)
+                    or self._loading_project == project_id)
+        if was_open:
+            self._loading_project = None
+            self._load_progress.hide()
+            self.task_loader.cancel()
+            self._rebalance_timer.stop()
+            if self.watcher is not None:
+                self.watcher.watch_project(None)
+            self.current_project = None
+            self.task_model.clear()
+        # Moving the project into the trash is a rename; its files are removed in the background
+        try:
+            self.storage.trash_project(project_id)
+        except Exception as e:
+            log.warning("Failed to move project %s to trash: %s", project_id, e)
+            QMessageBox.warning(self, "Delete Failed", f"Could not delete project '{pname}':\n{e}")
+            if was_open:
+                self.load_project_by_id(project_id)
+            return
+        self.project_cache.invalidate(project_id)
+        log.debug("Moved project to trash: %s", project_id)
         self.projects = [p for p in self.projects if p['id'] != project_id]
-        # Remove project file
-        import time
-        projects_dir = os.path.join(self.get_base_path(), 'projects')
-        project_path = os.path.join(projects_dir, f"{project_id}.json")
-        if os.path.exists(project_path):
-            os.remove(project_path)
-            cprint(f"[DEBUG] Deleted project file: {project_path}")
-        # Remove tasks folder
-        tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_id)
-        if os.path.exists(tasks_dir):
-            shutil.rmtree(tasks_dir)
-            cprint(f"[DEBUG] Deleted tasks folder: {tasks_dir}")
-        # Force disk sync and short delay
-        if hasattr(os, 'sync'):
-            os.sync()
-        time.sleep(0.1)
-        # Print directory contents for debug
-        cprint("[DEBUG] Projects dir after deletion:", os.listdir(projects_dir))
-        # Robust UI update: block signals, clear selection, refresh, and force repaint
+        # Update the sidebar in place and select the next project
         self.project_list.blockSignals(True)
-        self.project_list.clearSelection()
-        self.project_list.clearFocus()
-        # Use the same pattern as favourite: pass selected_project_id
-        self.refresh_project_list(selected_project_id=next_project_id)
-        QApplication.processEvents()
-        # Set selection to the next project if any
-        count = self.project_list.count()
-        if count > 0 and next_project_id:
-            for i in range(count):
-                item = self.project_list.item(i)
-                if item and item.toolTip() == next_project_id:
-                    self.project_list.setCurrentRow(i)
-                    QApplication.processEvents()
-                    self.load_project(i)
-                    break
-        elif count > 0:
-            self.project_list.setCurrentRow(0)
-            QApplication.processEvents()
-            self.load_project(0)
-        else:
-            self.project_list.setCurrentRow(-1)
-            self.project_list.clearFocus()
-            self.current_project = None
-            self.project_label.setText("No project selected")
-            self.task_list.setRowCount(0)
+        self.project_model.remove_project(project_id)
+        next_row = self.project_model.row_of(next_project_id)
+        if next_row < 0 and self.project_list.count() > 0:
+            next_row = 0
+        self.project_list.setCurrentRow(next_row)
         self.project_list.blockSignals(False)
-        self.project_list.repaint()
-        self.repaint()
+        self.load_project(next_row)
+        # Offer an undo until the deletion is committed
+        self._pending_delete = project_id
+        self._undo_delete_btn.show()
+        self.statusBar().showMessage(f"Deleted project '{pname}'", self.UNDO_DELETE_MS)
+        self._undo_delete_timer.start(self.UNDO_DELETE_MS)
+
+    def undo_delete_project(self):
+        """
+        Restore the most recently deleted project from the trash and select it.
+        """
+        project_id = self._pending_delete
+        if project_id is None:
+            return
+        self._pending_delete = None
+        self._undo_delete_timer.stop()
+        self._undo_delete_btn.hide()
+        self.statusBar().clearMessage()
+        self.storage.restore_project(project_id)
+        meta = self.storage.refresh_project(project_id)
+        if meta is None:
+            return
+        proj = {'id': meta['id'], 'name': meta['name'], 'favourite': meta.get('favourite', False)}
+        self.projects.append(proj)
+        # Put its row back and select it (which loads it)
+        self.project_list.setCurrentRow(self.project_model.add_project(proj))
 
-    def sort_tasks_by_text(self):
-        import os, json
-        # Sort tasks alphabetically by text
-        if not self.current_project or not self.current_project.get('tasks'):
+    def _commit_pending_delete(self):
+        if self._pending_delete is None:
             return
-        tasks = self.current_project['tasks']
-        tasks.sort(key=lambda t: t.get('text', '').lower())
-        # Update order field and save
-        project_id = self.current_project['id']
-        tasks_dir = os.path.join(self.get_base_path(), 'tasks', project_id)
-        for idx, task in enumerate(tasks):
-            task['order'] = idx
-            fpath = os.path.join(tasks_dir, f"{task['id']}.json")
-            with open(fpath, 'w', encoding='utf-8') as f:
-                json.dump(task, f, indent=2, ensure_ascii=False)
-        # Refresh UI
-        self.task_list.setRowCount(0)
-        for task in tasks:
-            self.add_task_row(task)
+        self.reclaimer.reclaim(self._pending_delete)
+        self.search_index.remove_project(self._pending_delete)
+        self._pending_delete = None
+        self._undo_delete_timer.stop()
+        self._undo_delete_btn.hide()
 
 
 if __name__ == "__main__":
-    print("App started")
-    print("Before QApplication")
+    # Level from CHECKLIST_LOG (e.g. debug); silent without a terminal
+    setup_logging()
+    profile = None
+    if '--profile-startup' in sys.argv:
+        # Report time-to-first-paint by phase on stderr (see startup_profile.py)
+        from startup_profile import StartupProfile
+        sys.argv.remove('--profile-startup')
+        profile = StartupProfile(_IMPORT_START)
+        profile.mark('imports')
     app = QApplication(sys.argv)
-    print("After QApplication")
-    win = ChecklistApp()
-    print("After ChecklistApp init")
+    if profile is not None:
+        profile.mark('QApplication')
+    win = ChecklistApp(startup_profile=profile)
+    if profile is not None:
+        profile.watch_paint(win)
     win.show()
-    print("After win.show()")
+    if profile is not None:
+        profile.mark('shown')
     sys.exit(app.exec_())
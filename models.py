@@ -1,9 +1,319 @@
 # models.py
-# Data models for projects and tasks (simple dicts used in this version)
-# This file is a placeholder for future expansion (e.g., custom classes, validation, etc.)
-
-# Example structure:
-# project = {
-#     'name': 'Project Name',
-#     'tasks': ['Task 1', 'Task 2', ...]
-# }
+# In-memory models of a loaded project and its tasks.
+# Storage backends read and write plain dicts; the app converts them to these classes once on
+# load (Project.from_storage) and back with Task.to_dict() when writing.
+import sys
+from bisect import bisect_left
+
+# Status strings are shared by every task instead of one copy per parsed record
+_STATUS_NAMES = {name: sys.intern(name) for name in ("Done", "WIP", "Pending")}
+
+# Sort modes of the task table -> sort key of a task
+STATUS_RANK = {'Pending': 0, 'WIP': 1, 'Done': 2}
+SORT_KEYS = {
+    # Pending, WIP, Done (then by order field)
+    'Status': lambda t: (STATUS_RANK.get(t.status, 3), t.order),
+    'Alphanumeric': lambda t: t.text.lower(),
+    # Creation timestamp (true chronological order)
+    'Oldest': lambda t: t.created,
+}
+# The sort mode that follows the tasks' manual order (the `order` field)
+MANUAL_SORT = 'Status'
+
+# `order` is a sparse rank: new tasks are placed ORDER_GAP after the last one and a moved task
+# gets a rank between its new neighbours, so a move rewrites only that task. Ranks closer than
+# MIN_ORDER_GAP are crowded and the project is respaced (Project.rebalance_orders).
+ORDER_GAP = 1024
+MIN_ORDER_GAP = 2 ** -20
+# Gap below which a rebalance is scheduled ahead of time (about 18 moves into the same spot)
+CROWDED_ORDER_GAP = 2 ** -8
+
+
+def rank_between(lo, hi):
+    """
+    A rank strictly between lo and hi (None for an open end), or None if they are too close.
+    Stays an integer while there is integer room, so untouched projects keep integer ranks.
+    """
+    if lo is None and hi is None:
+        return 0
+    if lo is None:
+        return hi - ORDER_GAP
+    if hi is None:
+        return lo + ORDER_GAP
+    if hi - lo <= MIN_ORDER_GAP:
+        return None
+    if isinstance(lo, int) and isinstance(hi, int) and hi - lo > 1:
+        return (lo + hi) // 2
+    mid = (lo + hi) / 2
+    # Very large ranks run out of float precision before MIN_ORDER_GAP
+    return mid if lo < mid < hi else None
+
+
+class Task:
+    """
+    One task/note. Uses __slots__ (no per-instance __dict__), which keeps 100k-task projects
+    several times smaller than the equivalent dicts.
+    Fields the app does not know about are kept in `extra` (None when there are none) so they
+    survive a load/save round trip.
+    `folded` is the case-folded text for the table filter, kept in step with `text` by the
+    constructor and update() (assign text through update() to keep it so).
+    """
+    __slots__ = ('id', 'text', 'status', 'order', 'created', 'extra', 'folded')
+    FIELDS = ('id', 'text', 'status', 'order', 'created')
+
+    def __init__(self, id, text='', status='Pending', order=0, created=0, extra=None):
+        self.id = id
+        self.text = text
+        self.folded = text.casefold()
+        self.status = _STATUS_NAMES.get(status, status)
+        self.order = order
+        self.created = created
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS}
+        return cls(data['id'], data.get('text', ''), data.get('status', 'Pending'),
+                   data.get('order', 0), data.get('created', 0), extra)
+
+    def to_dict(self):
+        data = dict(self.extra) if self.extra else {}
+        data.update(id=self.id, text=self.text, status=self.status, order=self.order, created=self.created)
+        return data
+
+    def update(self, fields):
+        """
+        Apply a dict of changed fields (as stored in a journal 'set' record).
+        Returns True if anything actually changed.
+        """
+        changed = False
+        for key, value in fields.items():
+            if key in self.FIELDS:
+                if key == 'status':
+                    value = _STATUS_NAMES.get(value, value)
+                if getattr(self, key) != value:
+                    setattr(self, key, value)
+                    if key == 'text':
+                        self.folded = value.casefold()
+                    changed = True
+            elif key != 'id':
+                if self.extra is None:
+                    self.extra = {}
+                if self.extra.get(key, object()) != value:
+                    self.extra[key] = value
+                    changed = True
+        return changed
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.text[:20]!r}, {self.status!r})"
+
+
+class TaskOrder:
+    """
+    One sort order of a project's tasks, maintained incrementally: the sorted keys and the
+    tasks in the same order. Adding, changing or removing a task is a bisect plus one list
+    insert/delete instead of a re-sort.
+    Keys are (sort key, seq), where seq numbers the tasks in the order they were added, so
+    ties keep the stored order like a stable sort would.
+    """
+    __slots__ = ('key_func', '_keys', '_tasks', '_key_of', '_next_seq')
+
+    def __init__(self, key_func, tasks):
+        self.key_func = key_func
+        keys = [(key_func(task), seq) for seq, task in enumerate(tasks)]
+        tasks = list(tasks)
+        rows = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys = [keys[i] for i in rows]
+        self._tasks = [tasks[i] for i in rows]
+        self._key_of = {task.id: key for task, key in zip(tasks, keys)}
+        self._next_seq = len(keys)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        return iter(self._tasks)
+
+    def task_at(self, row):
+        return self._tasks[row] if 0 <= row < len(self._tasks) else None
+
+    def row_of(self, task_id):
+        """Position of the task in this order, or -1."""
+        key = self._key_of.get(task_id)
+        return -1 if key is None else bisect_left(self._keys, key)
+
+    def insert(self, task, seq=None):
+        if seq is None:
+            seq, self._next_seq = self._next_seq, self._next_seq + 1
+        key = (self.key_func(task), seq)
+        row = bisect_left(self._keys, key)
+        self._keys.insert(row, key)
+        self._tasks.insert(row, task)
+        self._key_of[task.id] = key
+        return row
+
+    def remove(self, task_id):
+        key = self._key_of.pop(task_id, None)
+        if key is None:
+            return -1
+        row = bisect_left(self._keys, key)
+        del self._keys[row]
+        del self._tasks[row]
+        return row
+
+    def rekey(self):
+        """Recompute every key in place, after ranks changed without changing the order."""
+        keys = [(self.key_func(task), key[1]) for task, key in zip(self._tasks, self._keys)]
+        self._keys = keys
+        self._key_of = {task.id: key for task, key in zip(self._tasks, keys)}
+
+    def reposition(self, task):
+        """Move a task whose fields changed to where its new key belongs (it keeps its seq)."""
+        key = self._key_of.get(task.id)
+        if key is None or key[0] == self.key_func(task):
+            return
+        self.remove(task.id)
+        self.insert(task, key[1])
+
+
+class Project:
+    """
+    A loaded project: its metadata plus its tasks, indexed by task id.
+    The index is an insertion-ordered dict, so lookups, additions and removals are O(1)
+    and iteration keeps the stored order.
+    The sort orders of the task table (SORT_KEYS) are built on first use and then kept up to
+    date by add_task/update_task/remove_task, so changes to tasks must go through those.
+    """
+    __slots__ = ('id', 'name', 'favourite', '_tasks', '_orders', '_max_order')
+
+    def __init__(self, id, name, favourite=False, tasks=()):
+        self.id = id
+        self.name = name
+        self.favourite = favourite
+        self._tasks = {task.id: task for task in tasks}
+        # sort mode -> TaskOrder
+        self._orders = {}
+        # Upper bound of the tasks' ranks (None until next_order() first needs it)
+        self._max_order = None
+
+    @classmethod
+    def from_storage(cls, meta, task_dicts):
+        """
+        Build a project from the dicts returned by Storage.load_project/load_tasks.
+        """
+        return cls(meta['id'], meta['name'], meta.get('favourite', False),
+                   (Task.from_dict(t) for t in task_dicts if 'id' in t))
+
+    # --- Tasks ---
+    @property
+    def tasks(self):
+        """All tasks, in stored order (a view; don't add or remove tasks while iterating it)."""
+        return self._tasks.values()
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def get_task(self, task_id):
+        return self._tasks.get(task_id)
+
+    def add_task(self, task):
+        if task.id in self._tasks:
+            self.remove_task(task.id)
+        self._tasks[task.id] = task
+        for order in self._orders.values():
+            order.insert(task)
+        if self._max_order is not None and task.order > self._max_order:
+            self._max_order = task.order
+        return task
+
+    def update_task(self, task_id, fields):
+        """
+        Apply changed fields to a task (see Task.update) and move it in the sort orders.
+        Returns True if anything actually changed.
+        """
+        task = self._tasks.get(task_id)
+        if task is None or not task.update(fields):
+            return False
+        for order in self._orders.values():
+            order.reposition(task)
+        if self._max_order is not None and task.order > self._max_order:
+            self._max_order = task.order
+        return True
+
+    def remove_task(self, task_id):
+        task = self._tasks.pop(task_id, None)
+        if task is not None:
+            for order in self._orders.values():
+                order.remove(task_id)
+        return task
+
+    # --- Sort orders ---
+    def ordered(self, mode):
+        """The TaskOrder of a sort mode (a key of SORT_KEYS), built on first use."""
+        order = self._orders.get(mode)
+        if order is None:
+            order = self._orders[mode] = TaskOrder(SORT_KEYS[mode], self._tasks.values())
+        return order
+
+    def reset_orders(self):
+        """Drop the sort orders after many tasks were changed at once; they are rebuilt on use."""
+        self._orders.clear()
+        self._max_order = None
+
+    def next_order(self):
+        """Rank for a new task, after every existing one (the full scan happens once per project)."""
+        if self._max_order is None:
+            self._max_order = max((t.order for t in self._tasks.values()), default=-ORDER_GAP)
+        return self._max_order + ORDER_GAP
+
+    def rank_for_move(self, task_id, row):
+        """
+        Where dropping a task at row of the MANUAL_SORT order puts it: returns (status, rank).
+        The task joins the status group it lands in (its own if it lands next to it) and gets
+        a rank between its new neighbours in that group. Returns None if the drop does not move
+        it, and a None rank if the neighbours' ranks are crowded (see rebalance_orders).
+        """
+        order = self.ordered(MANUAL_SORT)
+        task = self._tasks.get(task_id)
+        current = order.row_of(task_id)
+        if task is None or row in (current, current + 1):
+            return None
+        before = order.task_at(row - 1) if row > 0 else None
+        after = order.task_at(row)
+        neighbours = [t.status for t in (before, after) if t is not None]
+        status = task.status if task.status in neighbours else neighbours[0]
+        lo = before.order if before is not None and before.status == status else None
+        hi = after.order if after is not None and after.status == status else None
+        return status, rank_between(lo, hi)
+
+    def rebalance_orders(self):
+        """
+        Respace the ranks evenly (ORDER_GAP apart) in the current MANUAL_SORT order.
+        Returns the tasks whose rank changed, for the caller to save in one batch.
+        """
+        changed = []
+        for i, task in enumerate(self.ordered(MANUAL_SORT)):
+            rank = i * ORDER_GAP
+            if task.order != rank:
+                task.order = rank
+                changed.append(task)
+        self._max_order = None
+        # The order itself is unchanged, only its keys
+        self._orders[MANUAL_SORT].rekey()
+        return changed
+
+    def is_crowded(self, task_id):
+        """True if the task's rank is within CROWDED_ORDER_GAP of a neighbour in its status group."""
+        order = self.ordered(MANUAL_SORT)
+        row = order.row_of(task_id)
+        task = order.task_at(row)
+        if task is None:
+            return False
+        for neighbour in (order.task_at(row - 1) if row > 0 else None, order.task_at(row + 1)):
+            if neighbour is not None and neighbour.status == task.status \
+                    and abs(task.order - neighbour.order) < CROWDED_ORDER_GAP:
+                return True
+        return False
+
+    def __repr__(self):
+        return f"Project({self.id!r}, {self.name!r}, {len(self._tasks)} tasks)"
@@ -0,0 +1,99 @@
+# project_cache.py
+# In-process LRU cache of loaded projects (metadata + parsed tasks).
+# Entries are validated with the storage's cheap project_version() token, so switching
+# back to a recently used project skips re-reading it while external edits are still noticed.
+import os
+import threading
+from collections import OrderedDict
+
+
+class ProjectCache:
+    """
+    LRU cache of loaded projects (models.Project, including their tasks), bounded by an
+    approximate memory budget. The cached project is the one the app works on, so the app's own edits are
+    reflected in it; note_write() keeps the validation token in step with those writes.
+    """
+    # Default budget; override with the CHECKLIST_CACHE_MB environment variable
+    DEFAULT_BUDGET_MB = 64
+    # Rough per-task overhead of a slotted Task (object, id string, index entry) on top of its text
+    TASK_OVERHEAD = 200
+
+    def __init__(self, budget_bytes=None):
+        if budget_bytes is None:
+            budget_bytes = int(float(os.environ.get('CHECKLIST_CACHE_MB', self.DEFAULT_BUDGET_MB)) * 1024 * 1024)
+        self.budget_bytes = budget_bytes
+        # project_id -> [project, version token, estimated size]
+        self._entries = OrderedDict()
+        self._size = 0
+        # note_write() is called from the write-behind thread
+        self._lock = threading.Lock()
+
+    def get(self, project_id, version_func):
+        """
+        Return the cached project if its version token still matches, else None.
+        """
+        with self._lock:
+            entry = self._entries.get(project_id)
+        if entry is None:
+            return None
+        version = version_func(project_id)
+        with self._lock:
+            if self._entries.get(project_id) is not entry:
+                return None
+            if entry[1] != version:
+                # Changed on disk by someone else: drop it and let the caller reload
+                self._remove(project_id)
+                return None
+            self._entries.move_to_end(project_id)
+            return entry[0]
+
+    def put(self, project_id, project, version):
+        size = self.estimate_size(project)
+        with self._lock:
+            self._remove(project_id)
+            self._entries[project_id] = [project, version, size]
+            self._size += size
+            # Evict least recently used projects, but always keep the one just added
+            while self._size > self.budget_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, project_id):
+        with self._lock:
+            self._remove(project_id)
+
+    def note_write(self, project_id, version_before, version_after):
+        """
+        Called after the app itself wrote to a project. If nothing else changed the project
+        since it was cached, the cached copy is still current and only its token advances.
+        """
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is None:
+                return
+            if entry[1] == version_before:
+                entry[1] = version_after
+            else:
+                self._remove(project_id)
+
+    def revalidate(self, project_id, version):
+        """
+        Mark the cached project as matching `version` (after external changes were applied to it in memory).
+        """
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is not None:
+                entry[1] = version
+
+    def __contains__(self, project_id):
+        with self._lock:
+            return project_id in self._entries
+
+    def _remove(self, project_id):
+        entry = self._entries.pop(project_id, None)
+        if entry is not None:
+            self._size -= entry[2]
+
+    @classmethod
+    def estimate_size(cls, project):
+        return sum(len(t.text) * 2 + cls.TASK_OVERHEAD for t in project.tasks) + cls.TASK_OVERHEAD
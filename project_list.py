@@ -0,0 +1,189 @@
+# project_list.py
+# Model/view implementation of the project sidebar.
+# The sidebar is a persistent list model over the project metadata dicts; adding, renaming,
+# (un)favouriting and deleting a project insert, move, repaint or remove just that row.
+from bisect import bisect_right
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QBrush, QColor
+from PyQt5.QtWidgets import QListView
+
+# Colors of favourite rows
+FAVOURITE_BACKGROUND = QColor(204, 153, 0)  # dark yellow
+FAVOURITE_FOREGROUND = QColor(255, 255, 255)  # white font
+
+
+def sort_key(proj):
+    """Favourites first, then others, both sorted by name."""
+    return (not proj.get('favourite', False), proj['name'].lower())
+
+
+class ProjectListModel(QAbstractListModel):
+    """
+    List model over project metadata dicts ({'id', 'name', 'favourite'}), kept in sidebar
+    order (sort_key) with bisect. Rows are mapped to project ids both ways; the id is also the
+    row's tooltip (as in the old QListWidget) and its Qt.UserRole data.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._projects = []
+        self._keys = []
+        # project id -> row; rebuilt lazily after rows were inserted, moved or removed
+        self._rows = {}
+        self._rows_stale = False
+        self._favourite_background = QBrush(FAVOURITE_BACKGROUND)
+        self._favourite_foreground = QBrush(FAVOURITE_FOREGROUND)
+
+    # --- Qt model interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._projects)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        proj = self._projects[index.row()]
+        favourite = proj.get('favourite', False)
+        if role == Qt.DisplayRole:
+            return f"⭐ {proj['name']}" if favourite else proj['name']
+        if role in (Qt.ToolTipRole, Qt.UserRole):
+            return proj['id']
+        if favourite and role == Qt.BackgroundRole:
+            return self._favourite_background
+        if favourite and role == Qt.ForegroundRole:
+            return self._favourite_foreground
+        return None
+
+    # --- Project access ---
+    def set_projects(self, projects):
+        """
+        Show these projects. If they show exactly what is shown already (e.g. a reload that
+        found no changes) the new dicts are adopted without a model reset, which keeps the
+        view's layout, scroll position and selection. Returns whether the model was reset.
+        """
+        projects = sorted(projects, key=sort_key)
+        if len(projects) == len(self._projects) and all(
+                a['id'] == b['id'] and a['name'] == b['name'] and a.get('favourite', False) == b.get('favourite', False)
+                for a, b in zip(projects, self._projects)):
+            self._projects = projects
+            return False
+        self.beginResetModel()
+        self._projects = projects
+        self._keys = [sort_key(p) for p in self._projects]
+        self._rows = {p['id']: row for row, p in enumerate(self._projects)}
+        self._rows_stale = False
+        self.endResetModel()
+        return True
+
+    def project_at(self, row):
+        if 0 <= row < len(self._projects):
+            return self._projects[row]
+        return None
+
+    def project_id_at(self, row):
+        proj = self.project_at(row)
+        return proj['id'] if proj is not None else None
+
+    def row_of(self, project_id):
+        """
+        Return the row showing the project with this id, or -1.
+        """
+        if self._rows_stale:
+            self._rows = {p['id']: row for row, p in enumerate(self._projects)}
+            self._rows_stale = False
+        return self._rows.get(project_id, -1)
+
+    def add_project(self, proj):
+        """
+        Insert a row for proj at its sorted position; returns the row.
+        """
+        key = sort_key(proj)
+        row = bisect_right(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._projects.insert(row, proj)
+        self._keys.insert(row, key)
+        self._rows_stale = True
+        self.endInsertRows()
+        return row
+
+    def remove_project(self, project_id):
+        """
+        Remove the row of the project with this id; returns the removed dict or None.
+        """
+        row = self.row_of(project_id)
+        if row < 0:
+            return None
+        self.beginRemoveRows(QModelIndex(), row, row)
+        proj = self._projects.pop(row)
+        del self._keys[row]
+        self._rows_stale = True
+        self.endRemoveRows()
+        return proj
+
+    def project_changed(self, project_id):
+        """
+        The name or favourite flag of a project dict changed: move its row to its new sorted
+        position (one move) or just repaint it. Returns the new row.
+        """
+        row = self.row_of(project_id)
+        if row < 0:
+            return -1
+        key = sort_key(self._projects[row])
+        if key != self._keys[row]:
+            # Position among the other rows (the old key still sits at row)
+            new_row = bisect_right(self._keys, key)
+            if new_row > row:
+                new_row -= 1
+            if new_row != row:
+                # beginMoveRows() takes the destination in the rows before the move
+                self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), new_row + 1 if new_row > row else new_row)
+                del self._keys[row]
+                proj = self._projects.pop(row)
+                self._keys.insert(new_row, key)
+                self._projects.insert(new_row, proj)
+                self._rows_stale = True
+                self.endMoveRows()
+                row = new_row
+            else:
+                self._keys[row] = key
+        self.dataChanged.emit(self.index(row), self.index(row))
+        return row
+
+
+class ProjectListView(QListView):
+    """
+    Sidebar view with the row-based current-item API of QListWidget (currentRow,
+    setCurrentRow, count, currentRowChanged).
+    currentRowChanged is only emitted when the current *project* changes, so moving the
+    current row (e.g. favouriting it) does not reload it.
+    """
+    currentRowChanged = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._current_id = None
+
+    def setModel(self, model):
+        super().setModel(model)
+        self.selectionModel().currentRowChanged.connect(self._on_current_changed)
+
+    def _on_current_changed(self, current, _previous):
+        project_id = current.data(Qt.UserRole) if current.isValid() else None
+        if project_id == self._current_id and project_id is not None:
+            return
+        self._current_id = project_id
+        self.currentRowChanged.emit(current.row() if current.isValid() else -1)
+
+    def currentRow(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def setCurrentRow(self, row):
+        if 0 <= row < self.count():
+            self.setCurrentIndex(self.model().index(row, 0))
+        else:
+            self.selectionModel().clearCurrentIndex()
+            self.clearSelection()
+
+    def count(self):
+        model = self.model()
+        return model.rowCount() if model is not None else 0
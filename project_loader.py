@@ -0,0 +1,81 @@
+# project_loader.py
+# Reads and parses projects on a worker thread, so opening a large project never blocks the GUI
+# (replaying a 100k-task journal, building the Task objects and the first sort take seconds).
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from models import Project
+
+
+class ProjectLoader(QObject):
+    """
+    Loads one project at a time in the background: metadata and tasks from storage, parsed into a
+    models.Project whose order for the requested sort mode is already built.
+    - request() replaces a request that has not started yet. A load that is already running
+      still finishes and is reported; the receiver tells by the project id whether it still
+      wants it.
+    - loaded(project_id, project, version) and failed(project_id, message) are emitted from the
+      worker thread and delivered in the receiver's thread. project is None if the project
+      does not exist.
+    """
+    loaded = pyqtSignal(str, object, object)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, storage, parent=None):
+        super().__init__(parent)
+        self.storage = storage
+        # (project_id, sort mode) of the next load
+        self._request = None
+        self._closing = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='checklist-project-loader', daemon=True)
+        self._thread.start()
+
+    def request(self, project_id, sort_mode):
+        with self._cond:
+            self._request = (project_id, sort_mode)
+            self._cond.notify()
+
+    def stop(self):
+        """
+        Drop a pending request and wait for a running load; nothing is reported afterwards.
+        """
+        with self._cond:
+            self._closing = True
+            self._request = None
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._request is None and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                (project_id, sort_mode), self._request = self._request, None
+            try:
+                project, version = self._load(project_id, sort_mode)
+            except Exception as e:
+                if not self._closing:
+                    self.failed.emit(project_id, str(e))
+                continue
+            if not self._closing:
+                self.loaded.emit(project_id, project, version)
+
+    def _load(self, project_id, sort_mode):
+        storage = self.storage
+        version = storage.project_version(project_id)
+        meta = storage.load_project(project_id)
+        if meta is None:
+            return None, version
+        tasks = storage.load_tasks(project_id)
+        # The first open of a legacy project migrates its task files, which changes the token;
+        # re-read so the cached copy is not dropped as stale on the next switch
+        after = storage.project_version(project_id)
+        if after != version:
+            version, tasks = after, storage.load_tasks(project_id)
+        project = Project.from_storage(meta, tasks)
+        project.ordered(sort_mode)
+        return project, version
@@ -0,0 +1,609 @@
+# search_index.py
+# Persistent full-text index over the text of every task in every project.
+# Kept in search_index.db (SQLite, next to projects/) and updated incrementally as tasks
+# are written, so searching never has to open a project or read its task files.
+import heapq
+import itertools
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from log import logger as log
+
+# The regex parser is not a public API: if it is missing or changes shape, required_literals()
+# finds no literals and regex searches are refused with the usual "needs 3 literals" message
+try:
+    from re import _parser as _sre_parse, _constants as _sre_constants
+except ImportError:
+    try:  # Python < 3.11
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            import sre_parse as _sre_parse
+            import sre_constants as _sre_constants
+    except ImportError:
+        _sre_parse = _sre_constants = None
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower-cased word tokens of a text (unicode aware)."""
+    return [w[:64] for w in _WORD_RE.findall(text.lower())]
+
+
+def trigrams(text):
+    """Distinct 3-character substrings of the case-folded text."""
+    folded = text.casefold()
+    return {folded[i:i + 3] for i in range(len(folded) - 2)}
+
+
+def required_literals(pattern):
+    """
+    Case-folded literal strings that every match of the regex must contain (runs of plain
+    characters that are not optional). Alternations, classes etc. just end a run, so the
+    result may be empty, but it never contains a string a match could do without. Empty as
+    well if the interpreter's regex parser is unavailable or unrecognized.
+    """
+    runs = []
+    current = []
+
+    def end_run():
+        if current:
+            runs.append(''.join(current).casefold())
+            current.clear()
+
+    def walk(items):
+        for op, arg in items:
+            if op == _sre_constants.LITERAL:
+                current.append(chr(arg))
+            elif op == _sre_constants.SUBPATTERN:
+                # A group at this level is required; its contents continue the run
+                walk(arg[-1])
+            elif op in (_sre_constants.MAX_REPEAT, _sre_constants.MIN_REPEAT) and arg[0] >= 1:
+                end_run()
+                walk(arg[2])
+                end_run()
+            elif op == _sre_constants.AT:
+                # Anchors match no characters
+                continue
+            else:
+                end_run()
+
+    if _sre_parse is None:
+        return []
+    try:
+        walk(_sre_parse.parse(pattern))
+    except re.error:
+        raise
+    except Exception:
+        return []
+    end_run()
+    return runs
+
+
+class SearchHits(list):
+    """Hits of a word query; truncated is set when not every matching task was ranked."""
+    truncated = False
+
+
+class SearchIndex:
+    """
+    Inverted index (term -> postings of (task, term frequency)) with BM25 ranking.
+    - docs: one row per indexed task (project id, task id, length in tokens, text for display)
+    - postings: (term, doc) -> tf and document length, clustered by term, so scoring a term is
+      one range read without touching docs
+    - terms: term -> document frequency
+    - grams / gram_counts: trigram -> tasks whose case-folded text contains it, and their number
+    - projects: project id -> storage version token the project was indexed at
+    - meta: schema version and the collection statistics (document count, total length)
+    Word queries (search) match every word; the last word also matches as a prefix (search as you
+    type). Substring and regex queries (search_substring, search_regex) intersect the trigram
+    postings of the literal text and only verify the tasks that contain all of them.
+    All methods are thread-safe. Updates (index_task, remove_task, add_project, remove_project,
+    note_write) and sync requests (request_sync) are queued and applied by a worker thread, so
+    neither the GUI nor the storage writer waits for SQLite; stop() (and close()) ends a running
+    sync between chunks and applies the queued updates.
+    """
+    FILENAME = 'search_index.db'
+    SCHEMA_VERSION = '2'
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS docs (
+            doc INTEGER PRIMARY KEY,
+            project_id TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            length INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            UNIQUE (project_id, task_id)
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            term TEXT NOT NULL,
+            doc INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            PRIMARY KEY (term, doc)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS grams (gram TEXT NOT NULL, doc INTEGER NOT NULL, PRIMARY KEY (gram, doc)) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS gram_counts (gram TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS projects (project_id TEXT PRIMARY KEY, version TEXT);
+    """
+    # BM25 parameters
+    K1 = 1.2
+    B = 0.75
+    # Tasks matching a word query beyond this many are not ranked (the newest ones are)
+    MAX_CANDIDATES = 5000
+    # Documents taken from the rarest word's postings per step of a word query
+    SEARCH_CHUNK = 900
+    # Number of completions of the last (prefix) word taken into account
+    PREFIX_EXPANSIONS = 32
+    # Candidates taken from the rarest trigram per step of a substring/regex query
+    GREP_CHUNK = 500
+    # Tasks written per transaction while (re)indexing a whole project
+    SYNC_CHUNK = 1000
+
+    def __init__(self, base_path):
+        self.path = os.path.join(base_path, self.FILENAME)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.executescript(self.SCHEMA)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            if row is None or row[0] != self.SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DELETE FROM docs; DELETE FROM postings; DELETE FROM terms; DELETE FROM projects; "
+                    "DELETE FROM grams; DELETE FROM gram_counts; DELETE FROM meta;")
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (self.SCHEMA_VERSION,))
+            # Collection statistics for BM25, kept in memory and in meta (so opening the index
+            # does not scan docs); counted once for an index written before they were stored
+            stats = dict(self._conn.execute(
+                "SELECT key, value FROM meta WHERE key IN ('doc_count', 'total_length')"))
+            if len(stats) == 2:
+                self._doc_count, self._total_length = int(stats['doc_count']), int(stats['total_length'])
+            else:
+                self._doc_count, total = self._conn.execute('SELECT COUNT(*), TOTAL(length) FROM docs').fetchone()
+                self._total_length = int(total)
+                self._save_stats()
+        # (project_id, task_id) -> text, or None to remove the task; task_id None removes the project
+        self._updates = OrderedDict()
+        # Version token changes, applied in order before the task updates:
+        # ('add', project_id, token) and ('advance', project_id, token_before, token_after)
+        self._version_ops = []
+        self._sync_storage = None
+        # (project_id, task ids updated meanwhile) while index_project runs
+        self._indexing = None
+        self._closing = False
+        # Set by the worker when it exits; later updates are applied by the caller
+        self._stopped = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='checklist-search-index', daemon=True)
+        self._thread.start()
+
+    # --- Updates (queued for the worker thread) ---
+    def index_task(self, project_id, task_id, text):
+        """Add or re-index one task."""
+        self._enqueue(project_id, task_id, text)
+
+    def remove_task(self, project_id, task_id):
+        self._enqueue(project_id, task_id, None)
+
+    def remove_project(self, project_id):
+        self._enqueue(project_id, None, None)
+
+    def add_project(self, project_id, version):
+        """
+        Record a project the app just created as indexed at `version`; its tasks are added
+        through index_task and later writes advance the token through note_write.
+        """
+        self._enqueue_version_op(('add', project_id, self._token(version)))
+
+    def request_sync(self, storage):
+        """
+        Run sync(storage) on the worker thread (once more, if one is running already).
+        """
+        with self._cond:
+            self._sync_storage = storage
+            self._cond.notify()
+
+    def _enqueue(self, project_id, task_id, text):
+        with self._cond:
+            if task_id is None:
+                # Pending updates of a removed project's tasks are moot
+                for key in [key for key in self._updates if key[0] == project_id]:
+                    del self._updates[key]
+                self._version_ops = [op for op in self._version_ops if op[1] != project_id]
+            key = (project_id, task_id)
+            # A newer update of the same task replaces the pending one
+            self._updates.pop(key, None)
+            self._updates[key] = text
+            self._cond.notify()
+            if not self._stopped:
+                return
+        self._apply_updates()
+
+    def _enqueue_version_op(self, op):
+        with self._cond:
+            self._version_ops.append(op)
+            self._cond.notify()
+            if not self._stopped:
+                return
+        self._apply_updates()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while (not self._updates and not self._version_ops and self._sync_storage is None
+                       and not self._closing):
+                    self._cond.wait()
+                if self._closing and not self._updates and not self._version_ops:
+                    self._stopped = True
+                    return
+                storage, self._sync_storage = self._sync_storage, None
+            self._apply_updates()
+            if storage is not None and not self._closing:
+                try:
+                    self.sync(storage)
+                except Exception as e:
+                    # The next request starts over; projects synced so far keep their tokens
+                    log.warning("Search index sync failed: %s", e)
+
+    def _apply_updates(self):
+        with self._cond:
+            updates, self._updates = self._updates, OrderedDict()
+            version_ops, self._version_ops = self._version_ops, []
+        if not updates and not version_ops:
+            return
+        with self._lock, self._conn:
+            for op in version_ops:
+                if op[0] == 'add':
+                    self._conn.execute('INSERT OR REPLACE INTO projects VALUES (?, ?)', op[1:])
+                else:
+                    _, project_id, before, after = op
+                    self._conn.execute('UPDATE projects SET version = ? WHERE project_id = ? AND version = ?',
+                                       (after, project_id, before))
+            for (project_id, task_id), text in updates.items():
+                if self._indexing is not None and self._indexing[0] == project_id:
+                    self._indexing[1].add(task_id)
+                if task_id is None:
+                    self._remove_project(project_id)
+                    continue
+                self._remove_doc(project_id, task_id)
+                if text is not None:
+                    self._add_docs(project_id, [(task_id, text)])
+
+    def _remove_project(self, project_id):
+        self._remove_project_docs(project_id)
+        self._conn.execute('DELETE FROM projects WHERE project_id = ?', (project_id,))
+
+    def index_project(self, project_id, tasks, version=None):
+        """
+        Replace the indexed tasks (dicts with 'id' and 'text') of a project and record the
+        storage version token they were read at.
+        """
+        # Last text per task id
+        items = list({task['id']: task.get('text', '') for task in tasks}.items())
+        with self._lock, self._conn:
+            self._remove_project_docs(project_id)
+            self._conn.execute('DELETE FROM projects WHERE project_id = ?', (project_id,))
+        # Tasks the app indexes or removes from here on are newer than `tasks`
+        touched = set()
+        self._indexing = (project_id, touched)
+        try:
+            for start in range(0, len(items), self.SYNC_CHUNK):
+                if self._closing:
+                    # Not recorded in projects: the next sync indexes the project again
+                    return
+                # Separate transactions, so searches and task edits are not blocked for a whole
+                # project; task edits queued in the meantime go in between
+                self._apply_updates()
+                if None in touched:
+                    # The project was removed meanwhile
+                    return
+                with self._lock, self._conn:
+                    self._add_docs(project_id, [item for item in items[start:start + self.SYNC_CHUNK]
+                                                if item[0] not in touched])
+            self._apply_updates()
+            if None in touched:
+                return
+            with self._lock, self._conn:
+                self._conn.execute('INSERT OR REPLACE INTO projects VALUES (?, ?)', (project_id, self._token(version)))
+        finally:
+            self._indexing = None
+
+    def note_write(self, project_id, version_before, version_after):
+        """
+        Called after the app wrote to a project (see WriteBehindStorage's on_written). The index
+        was already updated by the app, so only the recorded version token advances; if someone
+        else changed the project in between, the token stays behind and sync() re-indexes it.
+        Queued like the task updates, so the writer never waits for a sync chunk.
+        """
+        self._enqueue_version_op(('advance', project_id, self._token(version_before), self._token(version_after)))
+
+    def sync(self, storage):
+        """
+        Bring the index in line with storage: index new projects, re-index projects whose
+        version token changed since they were indexed and drop projects that are gone.
+        Only projects that changed are read, through storage.read_tasks, so the sync neither
+        waits for nor holds up the app's own storage access. Returns early once close() was called.
+        """
+        live = {p['id'] for p in storage.list_projects()}
+        with self._lock:
+            indexed = dict(self._conn.execute('SELECT project_id, version FROM projects'))
+            orphaned = {r[0] for r in self._conn.execute('SELECT DISTINCT project_id FROM docs')} - live
+        for project_id in (indexed.keys() | orphaned) - live:
+            with self._lock, self._conn:
+                self._remove_project(project_id)
+        for project_id in live:
+            if self._closing:
+                return
+            if project_id in indexed and not storage.persistent_versions:
+                continue
+            version = storage.project_version(project_id)
+            if indexed.get(project_id, '') == self._token(version):
+                continue
+            tasks = storage.read_tasks(project_id)
+            # Written to while it was read: read it again at the new token
+            after = storage.project_version(project_id)
+            if after != version:
+                version, tasks = after, storage.read_tasks(project_id)
+            self.index_project(project_id, tasks, version)
+
+    def stop(self):
+        """
+        Stop a running sync (between chunks), apply the queued updates and end the worker
+        thread. Updates made after that (e.g. note_write while the storage flushes) are applied
+        right away, until close().
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._conn.close()
+
+    # --- Queries ---
+    def search(self, query, limit=50):
+        """
+        Return up to `limit` hits for `query`, best first, as SearchHits of
+        {'project_id', 'task_id', 'text', 'score'} dicts. If more than MAX_CANDIDATES tasks
+        match, only the newest of them are ranked and the hits are marked truncated.
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return SearchHits()
+        with self._lock:
+            if not self._doc_count:
+                return SearchHits()
+            # One slot per query word: [(term, df)] of the terms that satisfy it
+            slots = []
+            for i, word in enumerate(words):
+                if i == len(words) - 1:
+                    terms = self._conn.execute(
+                        'SELECT term, df FROM terms WHERE term >= ? AND term < ? ORDER BY df DESC LIMIT ?',
+                        (word, word + '\U0010ffff', self.PREFIX_EXPANSIONS)).fetchall()
+                else:
+                    terms = self._conn.execute('SELECT term, df FROM terms WHERE term = ?', (word,)).fetchall()
+                if not terms:
+                    return SearchHits()
+                slots.append(terms)
+            # Walk the postings of the rarest word newest first, a chunk of documents at a time, and
+            # keep the ones that contain the other words too (as _grep does with trigrams)
+            slots.sort(key=lambda terms: sum(df for _, df in terms))
+            avg_length = self._total_length / self._doc_count or 1.0
+            # Several completions of a prefix can hit the same document: merge their postings by doc
+            postings = heapq.merge(*(self._postings_newest_first(term, self._idf(df)) for term, df in slots[0]),
+                                   key=lambda posting: -posting[0])
+            others = [[(term, self._idf(df)) for term, df in terms] for terms in slots[1:]]
+            scores = {}
+            truncated = False
+            chunk = {}
+            for doc, group in itertools.groupby(postings, key=lambda posting: posting[0]):
+                if len(scores) >= self.MAX_CANDIDATES:
+                    # Only the newest MAX_CANDIDATES matches are ranked
+                    truncated = True
+                    break
+                length, score = 0, 0.0
+                for _, tf, length, idf in group:
+                    score += self._bm25(idf, tf, length, avg_length)
+                chunk[doc] = (length, score)
+                if len(chunk) >= self.SEARCH_CHUNK:
+                    scores.update(self._narrow(chunk, others, avg_length))
+                    chunk = {}
+            if chunk and not truncated:
+                scores.update(self._narrow(chunk, others, avg_length))
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            hits = SearchHits()
+            hits.truncated = truncated
+            for doc, score in best:
+                project_id, task_id, text = self._conn.execute(
+                    'SELECT project_id, task_id, text FROM docs WHERE doc = ?', (doc,)).fetchone()
+                hits.append({'project_id': project_id, 'task_id': task_id, 'text': text, 'score': score})
+            return hits
+
+    def _postings_newest_first(self, term, idf):
+        for doc, tf, length in self._conn.execute(
+                'SELECT doc, tf, length FROM postings WHERE term = ? ORDER BY doc DESC', (term,)):
+            yield doc, tf, length, idf
+
+    def _narrow(self, candidates, slots, avg_length):
+        """
+        Keep the candidates ({doc: (length, score)}) that match a term of every slot, adding
+        their scores. Returns {doc: score}.
+        """
+        for terms in slots:
+            matched = {}
+            docs = list(candidates)
+            for term, idf in terms:
+                for start in range(0, len(docs), 900):
+                    chunk = docs[start:start + 900]
+                    rows = self._conn.execute(
+                        f"SELECT doc, tf FROM postings WHERE term = ? AND doc IN ({','.join('?' * len(chunk))})",
+                        [term] + chunk)
+                    for doc, tf in rows:
+                        length = candidates[doc][0]
+                        matched[doc] = matched.get(doc, 0.0) + self._bm25(idf, tf, length, avg_length)
+            candidates = {doc: (candidates[doc][0], candidates[doc][1] + extra) for doc, extra in matched.items()}
+            if not candidates:
+                break
+        return {doc: score for doc, (_, score) in candidates.items()}
+
+    def search_substring(self, fragment, limit=50):
+        """
+        Return up to `limit` tasks whose text contains `fragment` (case-insensitive), newest
+        first, as [{'project_id', 'task_id', 'text', 'score'}, ...] (score is always 0).
+        Raises ValueError for fragments shorter than 3 characters.
+        """
+        needle = fragment.casefold()
+        if len(needle) < 3:
+            raise ValueError("Type at least 3 characters")
+        return self._grep([needle], lambda text: needle in text.casefold(), limit)
+
+    def search_regex(self, pattern, limit=50):
+        """
+        Like search_substring, for a case-insensitive regular expression. The pattern must
+        contain a literal run of at least 3 characters that every match needs (e.g. "ABC-\\d+"),
+        which selects the candidates; raises ValueError otherwise and re.error if it is invalid.
+        """
+        regex = re.compile(pattern, re.IGNORECASE)
+        literals = [lit for lit in required_literals(pattern) if len(lit) >= 3]
+        if not literals:
+            raise ValueError("The pattern needs at least 3 literal characters in a row")
+        return self._grep(literals, lambda text: regex.search(text) is not None, limit)
+
+    def _grep(self, literals, verify, limit):
+        grams = set()
+        for literal in literals:
+            grams |= trigrams(literal)
+        with self._lock:
+            counts = []
+            for gram in grams:
+                row = self._conn.execute('SELECT df FROM gram_counts WHERE gram = ?', (gram,)).fetchone()
+                if row is None:
+                    return []
+                counts.append((row[0], gram))
+            counts.sort()
+            rarest, others = counts[0][1], [gram for _, gram in counts[1:]]
+            # Walk the rarest trigram's postings newest first, a chunk at a time: narrow each chunk
+            # with the other trigrams, then verify the survivors, until enough hits were found
+            postings = self._conn.execute('SELECT doc FROM grams WHERE gram = ? ORDER BY doc DESC', (rarest,))
+            hits = []
+            while len(hits) < limit:
+                chunk = [r[0] for r in postings.fetchmany(self.GREP_CHUNK)]
+                if not chunk:
+                    break
+                for gram in others:
+                    chunk = [r[0] for r in self._conn.execute(
+                        f"SELECT doc FROM grams WHERE gram = ? AND doc IN ({','.join('?' * len(chunk))})",
+                        [gram] + chunk)]
+                    if not chunk:
+                        break
+                if not chunk:
+                    continue
+                rows = self._conn.execute(
+                    f"SELECT project_id, task_id, text FROM docs WHERE doc IN ({','.join('?' * len(chunk))}) "
+                    "ORDER BY doc DESC", chunk)
+                for project_id, task_id, text in rows:
+                    if verify(text):
+                        hits.append({'project_id': project_id, 'task_id': task_id, 'text': text, 'score': 0.0})
+                        if len(hits) >= limit:
+                            break
+            return hits
+
+    # --- Internals (caller holds the lock and a transaction) ---
+    def _add_docs(self, project_id, items):
+        """
+        Index [(task_id, text)] that are not in the index yet, with one statement per table.
+        """
+        next_doc = self._conn.execute('SELECT COALESCE(MAX(doc), 0) + 1 FROM docs').fetchone()[0]
+        doc_rows = []
+        postings = []
+        df = {}
+        gram_rows = []
+        gram_df = {}
+        for doc, (task_id, text) in enumerate(items, next_doc):
+            for gram in trigrams(text):
+                gram_rows.append((gram, doc))
+                gram_df[gram] = gram_df.get(gram, 0) + 1
+            tokens = tokenize(text)
+            doc_rows.append((doc, project_id, task_id, len(tokens), text))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for term, tf in counts.items():
+                postings.append((term, doc, tf, len(tokens)))
+                df[term] = df.get(term, 0) + 1
+            self._total_length += len(tokens)
+        self._doc_count += len(doc_rows)
+        self._save_stats()
+        # Inserting in key order keeps the B-tree writes local
+        postings.sort()
+        self._conn.executemany('INSERT INTO docs VALUES (?, ?, ?, ?, ?)', doc_rows)
+        self._conn.executemany('INSERT INTO postings VALUES (?, ?, ?, ?)', postings)
+        self._conn.executemany('INSERT INTO terms VALUES (?, ?) ON CONFLICT(term) DO UPDATE SET df = df + excluded.df',
+                               sorted(df.items()))
+        gram_rows.sort()
+        self._conn.executemany('INSERT INTO grams VALUES (?, ?)', gram_rows)
+        self._conn.executemany(
+            'INSERT INTO gram_counts VALUES (?, ?) ON CONFLICT(gram) DO UPDATE SET df = df + excluded.df',
+            sorted(gram_df.items()))
+
+    def _remove_doc(self, project_id, task_id):
+        rows = self._conn.execute('SELECT doc, length, text FROM docs WHERE project_id = ? AND task_id = ?',
+                                  (project_id, task_id)).fetchall()
+        self._drop_docs(rows)
+
+    def _remove_project_docs(self, project_id):
+        rows = self._conn.execute('SELECT doc, length, text FROM docs WHERE project_id = ?', (project_id,)).fetchall()
+        self._drop_docs(rows)
+
+    def _drop_docs(self, rows):
+        if not rows:
+            return
+        # The stored text tells which postings each document has
+        postings = []
+        df = {}
+        gram_rows = []
+        gram_df = {}
+        for doc, length, text in rows:
+            for term in set(tokenize(text)):
+                postings.append((term, doc))
+                df[term] = df.get(term, 0) + 1
+            for gram in trigrams(text):
+                gram_rows.append((gram, doc))
+                gram_df[gram] = gram_df.get(gram, 0) + 1
+            self._total_length -= length
+        postings.sort()
+        self._conn.executemany('DELETE FROM postings WHERE term = ? AND doc = ?', postings)
+        self._conn.executemany('UPDATE terms SET df = df - ? WHERE term = ?', [(n, t) for t, n in sorted(df.items())])
+        self._conn.executemany('DELETE FROM terms WHERE term = ? AND df <= 0', [(t,) for t in df])
+        gram_rows.sort()
+        self._conn.executemany('DELETE FROM grams WHERE gram = ? AND doc = ?', gram_rows)
+        self._conn.executemany('UPDATE gram_counts SET df = df - ? WHERE gram = ?',
+                               [(n, g) for g, n in sorted(gram_df.items())])
+        self._conn.executemany('DELETE FROM gram_counts WHERE gram = ? AND df <= 0', [(g,) for g in gram_df])
+        self._conn.executemany('DELETE FROM docs WHERE doc = ?', [(row[0],) for row in rows])
+        self._doc_count -= len(rows)
+        self._save_stats()
+
+    def _save_stats(self):
+        self._conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                               [('doc_count', str(self._doc_count)), ('total_length', str(self._total_length))])
+
+    def _idf(self, df):
+        return math.log(1 + (self._doc_count - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, idf, tf, length, avg_length):
+        return idf * tf * (self.K1 + 1) / (tf + self.K1 * (1 - self.B + self.B * length / avg_length))
+
+    @staticmethod
+    def _token(version):
+        return repr(version)
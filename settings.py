@@ -0,0 +1,70 @@
+# settings.py
+# UI state that should survive a restart (selected theme, sort mode, window geometry, selected
+# project), kept in settings.json apart from the theme definitions in themes.json.
+import json
+import os
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+class SettingsStore(QObject):
+    """
+    Small key/value store backed by settings.json.
+    - The file is read once; get() is served from memory.
+    - set() with an unchanged value does nothing; otherwise the value is written with everything
+      else changed within the next `delay_ms` (one write per batch), on flush() and on exit.
+    - Writes go to a temporary file that replaces settings.json, so a crash never leaves it
+      half-written.
+    """
+    FILENAME = 'settings.json'
+    VERSION = 1
+
+    def __init__(self, base_path, delay_ms=1000, parent=None):
+        super().__init__(parent)
+        self.path = os.path.join(base_path, self.FILENAME)
+        self._values = self._read()
+        self._dirty = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def set(self, key, value):
+        if key in self._values and self._values[key] == value:
+            return
+        self._values[key] = value
+        self._dirty = True
+        # The first change of a batch starts the timer; later ones are written with it
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """
+        Write pending changes now.
+        """
+        self._timer.stop()
+        if not self._dirty:
+            return
+        data = {'version': self.VERSION, 'settings': self._values}
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            pass
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != self.VERSION:
+            return {}
+        values = data.get('settings')
+        return values if isinstance(values, dict) else {}
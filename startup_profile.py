@@ -0,0 +1,46 @@
+# startup_profile.py
+# Time-to-first-paint report for `main.py --profile-startup`.
+import sys
+import time
+
+from PyQt5.QtCore import QEvent, QObject
+
+
+class StartupProfile(QObject):
+    """
+    Records named startup phases (seconds since `start`) and prints them, with the time each
+    phase took, once the window was first painted and every phase in `until` was reached.
+    watch_paint(widget) marks 'first paint' on the widget's first paint event.
+    """
+    def __init__(self, start, until=('startup complete',), stream=None):
+        super().__init__()
+        self.start = start
+        self.until = set(until) | {'first paint'}
+        self.stream = stream if stream is not None else sys.stderr
+        self.phases = []
+        self._reported = False
+
+    def mark(self, phase):
+        if self._reported or any(name == phase for name, _ in self.phases):
+            return
+        self.phases.append((phase, time.perf_counter() - self.start))
+        if self.until.issubset(name for name, _ in self.phases):
+            self.report()
+
+    def watch_paint(self, widget):
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            self.mark('first paint')
+        return False
+
+    def report(self):
+        self._reported = True
+        lines = ["Startup profile (ms)", f"  {'phase':<24}{'at':>9}{'took':>9}"]
+        previous = 0.0
+        for phase, at in sorted(self.phases, key=lambda p: p[1]):
+            lines.append(f"  {phase:<24}{at * 1000:9.1f}{(at - previous) * 1000:9.1f}")
+            previous = at
+        print('\n'.join(lines), file=self.stream)
@@ -0,0 +1,67 @@
+# startup_snapshot.py
+# Warm-start snapshot: what the window showed at exit (the sidebar, the open project and its
+# task rows), so the next launch can show it again before reading any project from disk.
+import json
+import os
+
+
+class StartupSnapshot:
+    """
+    startup_snapshot.json, written on exit and read once at launch.
+    - The sidebar part is only used while the storage's listing_version() is unchanged.
+    - The open project (metadata, tasks in display order, sort mode) is only used while its
+      project_version() is unchanged.
+    Tokens are stored as JSON lists; the caller compares them with the live tokens through
+    matches().
+    """
+    FILENAME = 'startup_snapshot.json'
+    VERSION = 1
+
+    def __init__(self, base_path):
+        self.path = os.path.join(base_path, self.FILENAME)
+
+    @staticmethod
+    def matches(stored, current):
+        return current is not None and stored == json.loads(json.dumps(current))
+
+    def load(self):
+        """
+        Return the snapshot dict ({'listing_version', 'projects', 'project'}), or None.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != self.VERSION:
+            return None
+        if not isinstance(data.get('projects'), list):
+            return None
+        return data
+
+    def save(self, listing_version, projects, project=None):
+        """
+        Write the snapshot. projects are the sidebar dicts in display order; project is None or
+        {'meta', 'version', 'sort_mode', 'tasks'} (tasks as dicts, in display order, or None).
+        Without a listing version there is nothing to validate against: the snapshot is removed.
+        """
+        if listing_version is None:
+            self.remove()
+            return
+        data = {'version': self.VERSION, 'listing_version': listing_version,
+                'projects': [{'id': p['id'], 'name': p['name'], 'favourite': p.get('favourite', False)}
+                             for p in projects],
+                'project': project}
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -23,3 +23,963 @@ def save_projects(projects):
     path = get_data_path()
     with open(path, 'w', encoding='utf-8') as f:
         json.dump(projects, f, indent=2, ensure_ascii=False)
+
+
+# --- Append-only task journal (one log file per project) ---
+class TaskJournal:
+    """
+    Append-only log of the task records of one project, stored as tasks/<project_id>/journal.jsonl.
+    Each line is one JSON record:
+        {"op": "put", "task": {...}}                 full task (add / edit)
+        {"op": "set", "id": ..., "fields": {...}}    partial update (e.g. a status flip)
+        {"op": "del", "id": ...}                     task removed
+    Loading replays the log in one sequential read. Once the log holds many more records than
+    live tasks it is compacted into one "put" per task. Legacy per-task <uuid>.json files found
+    in the directory are migrated into the journal (and removed) on first open.
+    """
+    FILENAME = 'journal.jsonl'
+    # Compact once the log has at least this many records and more than COMPACT_RATIO per live task
+    COMPACT_MIN_RECORDS = 256
+    COMPACT_RATIO = 2
+
+    def __init__(self, tasks_dir):
+        self.tasks_dir = tasks_dir
+        self.path = os.path.join(tasks_dir, self.FILENAME)
+        # Replay statistics, known once the journal was loaded in this session
+        self._record_count = None
+        # task_id -> status of every live task
+        self._live = None
+        # (size, inode) of the journal as of the last load, for tailing it afterwards
+        self.loaded_size = 0
+        self.loaded_inode = None
+        # (size, inode) of the journal as rewritten by the last compact() of this session
+        self.compacted_size = 0
+        self.compacted_inode = None
+        # Whether the journal ends in a torn (unterminated) record; None until checked
+        self._torn = None
+
+    def load(self):
+        """
+        Replay the journal and return the list of live tasks (in insertion order).
+        """
+        self.migrate_legacy_files()
+        tasks = self._replay()
+        for task in tasks:
+            if 'order' not in task:
+                task['order'] = 0
+            if 'created' not in task:
+                task['created'] = 0
+        return tasks
+
+    def put(self, task):
+        self.put_many([task])
+
+    def put_many(self, tasks):
+        if self._live is not None:
+            self._live.update((t['id'], t.get('status', 'Pending')) for t in tasks)
+        self._append([{'op': 'put', 'task': task} for task in tasks])
+
+    def update(self, task_id, **fields):
+        if self._live is not None and 'status' in fields and task_id in self._live:
+            self._live[task_id] = fields['status']
+        self._append([{'op': 'set', 'id': task_id, 'fields': fields}])
+
+    def delete(self, task_id):
+        if self._live is not None:
+            self._live.pop(task_id, None)
+        self._append([{'op': 'del', 'id': task_id}])
+
+    def read(self):
+        """
+        Return the live tasks without changing anything on disk: legacy per-task files that were
+        not migrated yet are read as if they had been. For readers on other threads (the search
+        index); use a TaskJournal of their own, as replaying resets its statistics.
+        """
+        tasks = {task['id']: task for task in self._replay()}
+        if os.path.isdir(self.tasks_dir):
+            legacy = sorted(f for f in os.listdir(self.tasks_dir) if f.endswith('.json'))
+            for batch in read_task_files([os.path.join(self.tasks_dir, fname) for fname in legacy]):
+                tasks.update((task['id'], task) for task in batch)
+        return list(tasks.values())
+
+    def status_counts(self):
+        """
+        Return {status: count} of the live tasks, or None if the journal was not loaded yet.
+        """
+        if self._live is None:
+            return None
+        counts = {}
+        for status in self._live.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def compact(self):
+        """
+        Rewrite the journal with a single "put" record per live task.
+        The (size, inode) of the rewritten file is kept in compacted_size/compacted_inode, so a
+        watcher can tell this rewrite from one made by someone else.
+        """
+        tasks = self._replay()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+            for task in tasks:
+                f.write(self._encode({'op': 'put', 'task': task}))
+            f.flush()
+            os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        # Set before the replace: the new file keeps the inode of the temporary one
+        self.compacted_size, self.compacted_inode = st.st_size, st.st_ino
+        os.replace(tmp_path, self.path)
+        self._record_count = len(tasks)
+        self._torn = False
+
+    def migrate_legacy_files(self):
+        """
+        Move legacy per-task <uuid>.json files into the journal, then delete them.
+        The files are read in parallel (see read_task_files) and appended batch by batch; each
+        batch is fsynced before its files are removed, so a file is never read twice. Files that
+        cannot be removed are renamed to <name>.migrated, invalid ones to <name>.invalid.
+        """
+        if not os.path.isdir(self.tasks_dir):
+            return
+        legacy = sorted(f for f in os.listdir(self.tasks_dir) if f.endswith('.json'))
+        if not legacy:
+            return
+        paths = [os.path.join(self.tasks_dir, fname) for fname in legacy]
+        migrated = set()
+        for batch in read_task_files(paths, with_paths=True):
+            self._append([{'op': 'put', 'task': t} for _, t in batch], sync=True, compact=False)
+            for fpath, _ in batch:
+                self._retire_legacy_file(fpath, '.migrated')
+                migrated.add(fpath)
+        for fpath in paths:
+            if fpath not in migrated:
+                self._retire_legacy_file(fpath, '.invalid', remove=False)
+
+    @staticmethod
+    def _retire_legacy_file(fpath, suffix, remove=True):
+        if remove:
+            try:
+                os.remove(fpath)
+                return
+            except OSError:
+                pass
+        try:
+            os.replace(fpath, fpath + suffix)
+        except OSError:
+            pass
+
+    def _replay(self):
+        tasks = {}
+        record_count = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            # A torn final record (e.g. after a crash mid-append) is skipped and left in place; the
+            # next append starts on a new line and compaction drops it
+            end = data.rfind(b'\n') + 1
+            self._torn = end < len(data)
+            self.loaded_size = end
+            self.loaded_inode = os.stat(self.path).st_ino
+            for line in data[:end].splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                record_count += 1
+                op = record.get('op')
+                if op == 'put':
+                    task = record.get('task')
+                    if isinstance(task, dict) and 'id' in task:
+                        tasks[task['id']] = task
+                elif op == 'set':
+                    task = tasks.get(record.get('id'))
+                    if task is not None:
+                        task.update(record.get('fields', {}))
+                elif op == 'del':
+                    tasks.pop(record.get('id'), None)
+        self._record_count = record_count
+        self._live = {task_id: t.get('status', 'Pending') for task_id, t in tasks.items()}
+        return list(tasks.values())
+
+    def _append(self, records, sync=False, compact=True):
+        if not records:
+            return
+        os.makedirs(self.tasks_dir, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8', newline='\n') as f:
+            if self._torn is None:
+                self._torn = not self._ends_with_newline()
+            # Terminate a torn last record so it cannot swallow the first new one
+            f.write(('\n' if self._torn else '') + ''.join(self._encode(r) for r in records))
+            self._torn = False
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        if self._record_count is not None:
+            self._record_count += len(records)
+            if compact:
+                self._maybe_compact()
+
+    def _ends_with_newline(self):
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return True
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) == b'\n'
+        except OSError:
+            return True
+
+    def _maybe_compact(self):
+        live = len(self._live) if self._live is not None else 0
+        if self._record_count >= self.COMPACT_MIN_RECORDS and self._record_count > self.COMPACT_RATIO * live:
+            self.compact()
+
+    @staticmethod
+    def read_since(path, offset, inode=None):
+        """
+        Read the complete records appended to a journal after byte `offset`.
+        Returns (records, new_offset, inode), or None if the journal was rewritten or replaced
+        in the meantime (e.g. compacted), in which case it has to be replayed from the start.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if st.st_size < offset or (inode is not None and st.st_ino != inode):
+            return None
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # A record still being appended is picked up by the next read
+        end = data.rfind(b'\n') + 1
+        records = []
+        for line in data[:end].splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records, offset + end, st.st_ino
+
+    @staticmethod
+    def _encode(record):
+        return json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+# --- Parallel reading of per-task files ---
+# Bounded pool: opening and parsing many small files is dominated by per-file latency
+# (cold cache, network drives), which overlaps well across threads.
+READ_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+READ_BATCH_SIZE = 256
+
+
+def _read_task_file(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            task = json.load(f)
+    except Exception:
+        return None
+    if not isinstance(task, dict) or 'id' not in task:
+        return None
+    if 'order' not in task:
+        task['order'] = 0
+    # Keep the file creation time as the creation timestamp (the file may go away afterwards)
+    if 'created' not in task:
+        try:
+            task['created'] = os.stat(path).st_ctime
+        except Exception:
+            task['created'] = 0
+    return task
+
+
+def read_task_files(paths, workers=None, batch_size=READ_BATCH_SIZE, with_paths=False):
+    """
+    Read and parse task files on a thread pool, yielding lists of tasks in the order of `paths`.
+    At most a few batches are in flight at once, so memory stays bounded and the consumer can
+    start on the first batch while later files are still being read.
+    Unreadable or invalid files are skipped. With workers=1 the files are read serially.
+    With with_paths=True the batches hold (path, task) pairs.
+    """
+    workers = workers or READ_WORKERS
+    if workers <= 1 or len(paths) <= 1:
+        for start in range(0, len(paths), batch_size):
+            yield _read_task_chunk(paths[start:start + batch_size], with_paths)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    # Each job reads a small chunk of files, which keeps the per-future overhead low
+    chunk = max(1, min(64, batch_size))
+    chunks = [paths[start:start + chunk] for start in range(0, len(paths), chunk)]
+    window = workers * 2
+    with ThreadPoolExecutor(max_workers=min(workers, len(chunks)), thread_name_prefix='checklist-read') as pool:
+        in_flight = [pool.submit(_read_task_chunk, c, with_paths) for c in chunks[:window]]
+        next_chunk = len(in_flight)
+        batch = []
+        for i in range(len(chunks)):
+            tasks = in_flight[i].result()
+            in_flight[i] = None
+            if next_chunk < len(chunks):
+                in_flight.append(pool.submit(_read_task_chunk, chunks[next_chunk], with_paths))
+                next_chunk += 1
+            batch.extend(tasks)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def _read_task_chunk(paths, with_paths=False):
+    if with_paths:
+        return [(p, t) for p, t in zip(paths, map(_read_task_file, paths)) if t is not None]
+    return [t for t in map(_read_task_file, paths) if t is not None]
+
+
+# --- Pluggable storage backends ---
+class Storage:
+    """
+    Interface for persisting projects and their tasks.
+    Projects are dicts with at least 'id', 'name' and 'favourite'; tasks are dicts with
+    at least 'id', 'text', 'status', 'order' and 'created'.
+    """
+    # Whether project_version() tokens stay comparable across sessions (persisted caches rely on it)
+    persistent_versions = True
+
+    def list_projects(self):
+        """
+        Return [{'id', 'name', 'favourite', 'task_counts'}, ...] for every project.
+        task_counts maps status -> number of tasks, or is None when not known yet.
+        """
+        raise NotImplementedError
+
+    def load_project(self, project_id):
+        """Return the project metadata dict, or None if the project does not exist."""
+        raise NotImplementedError
+
+    def project_exists(self, project_id):
+        return self.load_project(project_id) is not None
+
+    def project_version(self, project_id):
+        """
+        Return a cheap token that changes whenever the project or its tasks change on disk
+        (used to validate cached projects without re-reading them).
+        """
+        raise NotImplementedError
+
+    def listing_version(self):
+        """
+        Return a cheap token that changes whenever list_projects() would return something else
+        (projects added, removed, renamed or (un)favourited), or None if there is none. Only
+        meaningful across sessions when persistent_versions is set.
+        """
+        return None
+
+    def save_project(self, project):
+        """Create or overwrite a project's metadata."""
+        raise NotImplementedError
+
+    def refresh_project(self, project_id):
+        """
+        Re-read one project's metadata after it changed on disk (refreshing any listing cache).
+        Returns the metadata, or None if the project no longer exists.
+        """
+        return self.load_project(project_id)
+
+    def update_project(self, project_id, **fields):
+        project = self.load_project(project_id)
+        if project is None:
+            return
+        project.update(fields)
+        self.save_project(project)
+
+    def delete_project(self, project_id):
+        """Remove a project and all of its tasks."""
+        raise NotImplementedError
+
+    def trash_project(self, project_id):
+        """Move a project into the trash (cheap); it disappears from list_projects()."""
+        raise NotImplementedError
+
+    def restore_project(self, project_id):
+        """Bring a trashed project back."""
+        raise NotImplementedError
+
+    def list_trash(self):
+        """Return the ids of all trashed projects."""
+        raise NotImplementedError
+
+    def purge_trash(self, project_id):
+        """
+        Physically remove a trashed project. Called from the trash reclaimer thread,
+        so it must not touch state shared with the other methods.
+        """
+        raise NotImplementedError
+
+    def load_tasks(self, project_id):
+        """Return the list of tasks of a project."""
+        raise NotImplementedError
+
+    def read_tasks(self, project_id):
+        """
+        Return the list of tasks of a project for a reader on another thread (the search index):
+        like load_tasks, but without migrating anything or touching state shared with the other
+        methods, so it needs no serialization with them.
+        """
+        raise NotImplementedError
+
+    def save_task(self, project_id, task):
+        self.save_tasks(project_id, [task])
+
+    def save_tasks(self, project_id, tasks):
+        """Create or overwrite several tasks in one batch."""
+        raise NotImplementedError
+
+    def update_task(self, project_id, task_id, **fields):
+        """Change some fields of a stored task (e.g. its status)."""
+        raise NotImplementedError
+
+    def delete_task(self, project_id, task_id):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ProjectIndex:
+    """
+    Single file (project_index.json) holding the sidebar metadata of every project:
+    id, name, favourite, task counts per status and the mtimes they were read at.
+    It is updated whenever a project changes, so listing projects is one file read
+    instead of parsing every projects/<id>.json. At load time it is validated against
+    the mtime of the projects/ directory (added/removed projects) and of each project
+    file (in-place edits); task counts are dropped when the project's journal changed
+    behind our back and are recomputed the next time the project is loaded.
+    """
+    FILENAME = 'project_index.json'
+    VERSION = 1
+
+    def __init__(self, base_path, projects_dir, tasks_root):
+        self.path = os.path.join(base_path, self.FILENAME)
+        self.projects_dir = projects_dir
+        self.tasks_root = tasks_root
+        # project_id -> entry dict; None until load() ran
+        self.entries = None
+        self._dirty = False
+
+    def load(self):
+        """
+        Read and validate the index, rescanning only what changed on disk.
+        """
+        data = None
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception:
+                data = None
+        if not isinstance(data, dict) or data.get('version') != self.VERSION:
+            data = {'projects_mtime': None, 'projects': {}}
+            self._dirty = True
+        self.entries = data.get('projects', {})
+        dir_mtime = self._mtime(self.projects_dir)
+        if dir_mtime != data.get('projects_mtime'):
+            # Projects were added or removed: re-list the directory (entries for unchanged files are kept)
+            on_disk = set()
+            if os.path.isdir(self.projects_dir):
+                on_disk = {f[:-5] for f in os.listdir(self.projects_dir) if f.endswith('.json')}
+            for project_id in set(self.entries) - on_disk:
+                del self.entries[project_id]
+            for project_id in on_disk - set(self.entries):
+                self._refresh_entry(project_id)
+            self._dirty = True
+        for project_id, entry in list(self.entries.items()):
+            if self._mtime(self._project_path(project_id)) != entry.get('mtime'):
+                self._refresh_entry(project_id)
+            if entry.get('task_counts') is not None and self._mtime(self._journal_path(project_id)) != entry.get('tasks_mtime'):
+                entry['task_counts'] = None
+                self._dirty = True
+        self.save()
+        return self.entries
+
+    def projects(self):
+        if self.entries is None:
+            self.load()
+        return [dict(e) for e in self.entries.values()]
+
+    def put(self, project):
+        if self.entries is None:
+            self.load()
+        entry = self.entries.setdefault(project['id'], {'task_counts': None, 'tasks_mtime': None})
+        entry.update({'id': project['id'], 'name': project['name'], 'favourite': project.get('favourite', False),
+                      'mtime': self._mtime(self._project_path(project['id']))})
+        self._dirty = True
+        self.save()
+
+    def remove(self, project_id):
+        if self.entries is not None and self.entries.pop(project_id, None) is not None:
+            self._dirty = True
+            self.save()
+
+    def refresh(self, project_id):
+        """
+        Re-read a single project file (or drop its entry if the file is gone).
+        """
+        if self.entries is None:
+            self.load()
+        if os.path.exists(self._project_path(project_id)):
+            self._refresh_entry(project_id)
+        elif self.entries.pop(project_id, None) is not None:
+            self._dirty = True
+        self.save()
+        entry = self.entries.get(project_id)
+        return dict(entry) if entry is not None else None
+
+    def set_task_counts(self, project_id, counts):
+        """
+        Record task counts in memory; they are written with the next save().
+        """
+        entry = self.entries.get(project_id) if self.entries is not None else None
+        if entry is None or counts is None:
+            return
+        entry['task_counts'] = counts
+        entry['tasks_mtime'] = self._mtime(self._journal_path(project_id))
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty or self.entries is None:
+            return
+        data = {'version': self.VERSION, 'projects_mtime': self._mtime(self.projects_dir), 'projects': self.entries}
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            pass
+
+    def _refresh_entry(self, project_id):
+        path = self._project_path(project_id)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                proj = json.load(f)
+        except Exception:
+            proj = None
+        if not isinstance(proj, dict) or 'id' not in proj or 'name' not in proj:
+            self.entries.pop(project_id, None)
+        else:
+            entry = self.entries.setdefault(project_id, {'task_counts': None, 'tasks_mtime': None})
+            entry.update({'id': proj['id'], 'name': proj['name'], 'favourite': proj.get('favourite', False),
+                          'mtime': self._mtime(path)})
+        self._dirty = True
+
+    def _project_path(self, project_id):
+        return os.path.join(self.projects_dir, f"{project_id}.json")
+
+    def _journal_path(self, project_id):
+        return os.path.join(self.tasks_root, project_id, TaskJournal.FILENAME)
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+
+class FileStorage(Storage):
+    """
+    The directory layout: projects/<id>.json for project metadata and one
+    TaskJournal per project under tasks/<id>/. Project listings are served
+    from a ProjectIndex.
+    """
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.projects_dir = os.path.join(base_path, 'projects')
+        self.tasks_root = os.path.join(base_path, 'tasks')
+        self.trash_dir = os.path.join(base_path, 'trash')
+        self.index = ProjectIndex(base_path, self.projects_dir, self.tasks_root)
+        # project_id -> TaskJournal
+        self._journals = {}
+
+    def journal(self, project_id):
+        journal = self._journals.get(project_id)
+        if journal is None:
+            journal = TaskJournal(os.path.join(self.tasks_root, project_id))
+            self._journals[project_id] = journal
+        return journal
+
+    def _project_path(self, project_id):
+        return os.path.join(self.projects_dir, f"{project_id}.json")
+
+    def list_projects(self):
+        return self.index.projects()
+
+    def load_project(self, project_id):
+        path = self._project_path(project_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            proj = json.load(f)
+        proj.setdefault('favourite', False)
+        return proj
+
+    def project_exists(self, project_id):
+        # Trashed projects still reserve their id until they are purged
+        return (os.path.exists(self._project_path(project_id))
+                or os.path.exists(os.path.join(self.trash_dir, project_id)))
+
+    def project_version(self, project_id):
+        # Two stats: the metadata file and the task journal (appends change mtime and size)
+        version = []
+        for path in (self._project_path(project_id),
+                     os.path.join(self.tasks_root, project_id, TaskJournal.FILENAME)):
+            try:
+                st = os.stat(path)
+                version.extend((st.st_mtime_ns, st.st_size))
+            except OSError:
+                version.extend((None, None))
+        return tuple(version)
+
+    def listing_version(self):
+        # Adding or removing a project changes the directory; renames and favourites rewrite the
+        # project file in place, but the app records them in the project index (files edited in
+        # place by other tools are caught when the index is validated)
+        return (ProjectIndex._mtime(self.projects_dir), ProjectIndex._mtime(self.index.path))
+
+    def save_project(self, project):
+        os.makedirs(self.projects_dir, exist_ok=True)
+        os.makedirs(os.path.join(self.tasks_root, project['id']), exist_ok=True)
+        meta = {k: v for k, v in project.items() if k != 'tasks'}
+        with open(self._project_path(project['id']), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        self.index.put(meta)
+
+    def refresh_project(self, project_id):
+        if self.index.refresh(project_id) is None:
+            return None
+        return self.load_project(project_id)
+
+    def delete_project(self, project_id):
+        import shutil
+        self._journals.pop(project_id, None)
+        path = self._project_path(project_id)
+        if os.path.exists(path):
+            os.remove(path)
+        tasks_dir = os.path.join(self.tasks_root, project_id)
+        if os.path.exists(tasks_dir):
+            shutil.rmtree(tasks_dir)
+        self.index.remove(project_id)
+
+    def trash_project(self, project_id):
+        # Two renames: trash/<id>/project.json and trash/<id>/tasks/
+        self._journals.pop(project_id, None)
+        target = os.path.join(self.trash_dir, project_id)
+        os.makedirs(target, exist_ok=True)
+        path = self._project_path(project_id)
+        if os.path.exists(path):
+            os.replace(path, os.path.join(target, 'project.json'))
+        tasks_dir = os.path.join(self.tasks_root, project_id)
+        if os.path.exists(tasks_dir):
+            os.rename(tasks_dir, os.path.join(target, 'tasks'))
+        self.index.remove(project_id)
+
+    def restore_project(self, project_id):
+        source = os.path.join(self.trash_dir, project_id)
+        trashed_meta = os.path.join(source, 'project.json')
+        if not os.path.exists(trashed_meta):
+            return
+        trashed_tasks = os.path.join(source, 'tasks')
+        if os.path.exists(trashed_tasks):
+            os.makedirs(self.tasks_root, exist_ok=True)
+            os.rename(trashed_tasks, os.path.join(self.tasks_root, project_id))
+        os.makedirs(self.projects_dir, exist_ok=True)
+        os.replace(trashed_meta, self._project_path(project_id))
+        os.rmdir(source)
+        self.index.put(self.load_project(project_id))
+
+    def list_trash(self):
+        if not os.path.isdir(self.trash_dir):
+            return []
+        return os.listdir(self.trash_dir)
+
+    def purge_trash(self, project_id):
+        import shutil
+        shutil.rmtree(os.path.join(self.trash_dir, project_id), ignore_errors=True)
+
+    def load_tasks(self, project_id):
+        journal = self.journal(project_id)
+        tasks = journal.load()
+        self.index.set_task_counts(project_id, journal.status_counts())
+        return tasks
+
+    def read_tasks(self, project_id):
+        return TaskJournal(os.path.join(self.tasks_root, project_id)).read()
+
+    def save_tasks(self, project_id, tasks):
+        journal = self.journal(project_id)
+        journal.put_many(tasks)
+        self.index.set_task_counts(project_id, journal.status_counts())
+
+    def update_task(self, project_id, task_id, **fields):
+        journal = self.journal(project_id)
+        journal.update(task_id, **fields)
+        self.index.set_task_counts(project_id, journal.status_counts())
+
+    def delete_task(self, project_id, task_id):
+        journal = self.journal(project_id)
+        journal.delete(task_id)
+        self.index.set_task_counts(project_id, journal.status_counts())
+
+    def close(self):
+        self.index.save()
+
+
+class SQLiteStorage(Storage):
+    """
+    Single-file SQLite database (WAL mode) with indexed task queries and transactional batch writes.
+    Task fields other than the indexed columns are kept in a JSON 'extra' column.
+    """
+    FILENAME = 'checklist.db'
+    # Version tokens are built from per-connection counters
+    persistent_versions = False
+    TASK_COLUMNS = ('id', 'text', 'status', 'order', 'created')
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            favourite INTEGER NOT NULL DEFAULT 0,
+            extra TEXT,
+            deleted_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+            text TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL DEFAULT 'Pending',
+            "order" REAL NOT NULL DEFAULT 0,
+            created REAL NOT NULL DEFAULT 0,
+            extra TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks(project_id);
+        CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(project_id, status);
+        CREATE INDEX IF NOT EXISTS idx_tasks_order ON tasks(project_id, "order");
+        CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(project_id, created);
+    """
+
+    def __init__(self, base_path, filename=None):
+        import sqlite3
+        self.path = os.path.join(base_path, filename or self.FILENAME)
+        self.is_new = not os.path.exists(self.path)
+        # Shared with the write-behind worker thread; callers serialize access
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(self.SCHEMA)
+        # project_id -> number of writes this connection made to the project
+        self._write_counts = {}
+        # Databases created before projects could be trashed lack the deleted_at column
+        columns = {r['name'] for r in self.conn.execute('PRAGMA table_info(projects)')}
+        if 'deleted_at' not in columns:
+            with self.conn:
+                self.conn.execute('ALTER TABLE projects ADD COLUMN deleted_at REAL')
+
+    def list_projects(self):
+        projects = {}
+        for r in self.conn.execute('SELECT id, name, favourite FROM projects WHERE deleted_at IS NULL'):
+            projects[r['id']] = {'id': r['id'], 'name': r['name'], 'favourite': bool(r['favourite']), 'task_counts': {}}
+        for r in self.conn.execute('SELECT project_id, status, COUNT(*) AS n FROM tasks GROUP BY project_id, status'):
+            if r['project_id'] in projects:
+                projects[r['project_id']]['task_counts'][r['status']] = r['n']
+        return list(projects.values())
+
+    def load_project(self, project_id):
+        row = self.conn.execute('SELECT id, name, favourite, extra FROM projects WHERE id = ? AND deleted_at IS NULL', (project_id,)).fetchone()
+        if row is None:
+            return None
+        proj = json.loads(row['extra']) if row['extra'] else {}
+        proj.update({'id': row['id'], 'name': row['name'], 'favourite': bool(row['favourite'])})
+        return proj
+
+    def save_project(self, project):
+        self._bump(project['id'])
+        extra = {k: v for k, v in project.items() if k not in ('id', 'name', 'favourite', 'tasks')}
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO projects (id, name, favourite, extra) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(id) DO UPDATE SET name = excluded.name, favourite = excluded.favourite, extra = excluded.extra',
+                (project['id'], project['name'], int(bool(project.get('favourite', False))), json.dumps(extra) if extra else None)
+            )
+
+    def update_project(self, project_id, **fields):
+        self._bump(project_id)
+        if set(fields) <= {'name', 'favourite'}:
+            with self.conn:
+                for key, value in fields.items():
+                    value = int(bool(value)) if key == 'favourite' else value
+                    self.conn.execute(f'UPDATE projects SET {key} = ? WHERE id = ?', (value, project_id))
+            return
+        super().update_project(project_id, **fields)
+
+    def delete_project(self, project_id):
+        self._bump(project_id)
+        with self.conn:
+            self.conn.execute('DELETE FROM tasks WHERE project_id = ?', (project_id,))
+            self.conn.execute('DELETE FROM projects WHERE id = ?', (project_id,))
+
+    def project_exists(self, project_id):
+        # Trashed projects still reserve their id until they are purged
+        return self.conn.execute('SELECT 1 FROM projects WHERE id = ?', (project_id,)).fetchone() is not None
+
+    def project_version(self, project_id):
+        # data_version changes when another connection commits; our own writes are counted per project
+        data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        return (data_version, self._write_counts.get(project_id, 0))
+
+    def _bump(self, project_id):
+        self._write_counts[project_id] = self._write_counts.get(project_id, 0) + 1
+
+    def trash_project(self, project_id):
+        self._bump(project_id)
+        import time
+        with self.conn:
+            self.conn.execute('UPDATE projects SET deleted_at = ? WHERE id = ?', (time.time(), project_id))
+
+    def restore_project(self, project_id):
+        self._bump(project_id)
+        with self.conn:
+            self.conn.execute('UPDATE projects SET deleted_at = NULL WHERE id = ?', (project_id,))
+
+    def list_trash(self):
+        return [r['id'] for r in self.conn.execute('SELECT id FROM projects WHERE deleted_at IS NOT NULL')]
+
+    def purge_trash(self, project_id):
+        import sqlite3
+        # Own connection: this runs on the reclaimer thread, concurrently with the main one (WAL)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                if conn.execute('SELECT 1 FROM projects WHERE id = ? AND deleted_at IS NOT NULL', (project_id,)).fetchone():
+                    conn.execute('DELETE FROM tasks WHERE project_id = ?', (project_id,))
+                    conn.execute('DELETE FROM projects WHERE id = ?', (project_id,))
+        finally:
+            conn.close()
+
+    def load_tasks(self, project_id):
+        return self._select_tasks(self.conn, project_id)
+
+    def read_tasks(self, project_id):
+        import sqlite3
+        # Own connection, like purge_trash: the shared one is serialized by the caller
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            return self._select_tasks(conn, project_id)
+        finally:
+            conn.close()
+
+    def _select_tasks(self, conn, project_id):
+        rows = conn.execute(
+            'SELECT id, text, status, "order", created, extra FROM tasks WHERE project_id = ? ORDER BY created',
+            (project_id,)
+        ).fetchall()
+        return [self._row_to_task(r) for r in rows]
+
+    def save_tasks(self, project_id, tasks):
+        self._bump(project_id)
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO tasks (id, project_id, text, status, "order", created, extra) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [self._task_to_row(project_id, t) for t in tasks]
+            )
+
+    def update_task(self, project_id, task_id, **fields):
+        self._bump(project_id)
+        columns = {k: v for k, v in fields.items() if k in self.TASK_COLUMNS and k != 'id'}
+        with self.conn:
+            for key, value in columns.items():
+                self.conn.execute(f'UPDATE tasks SET "{key}" = ? WHERE id = ? AND project_id = ?', (value, task_id, project_id))
+            extra_fields = {k: v for k, v in fields.items() if k not in self.TASK_COLUMNS}
+            if extra_fields:
+                row = self.conn.execute('SELECT extra FROM tasks WHERE id = ?', (task_id,)).fetchone()
+                if row is not None:
+                    extra = json.loads(row['extra']) if row['extra'] else {}
+                    extra.update(extra_fields)
+                    self.conn.execute('UPDATE tasks SET extra = ? WHERE id = ?', (json.dumps(extra), task_id))
+
+    def delete_task(self, project_id, task_id):
+        self._bump(project_id)
+        with self.conn:
+            self.conn.execute('DELETE FROM tasks WHERE id = ? AND project_id = ?', (task_id, project_id))
+
+    def close(self):
+        self.conn.close()
+
+    def _task_to_row(self, project_id, task):
+        extra = {k: v for k, v in task.items() if k not in self.TASK_COLUMNS}
+        return (task['id'], project_id, task.get('text', ''), task.get('status', 'Pending'),
+                task.get('order', 0), task.get('created', 0), json.dumps(extra) if extra else None)
+
+    @staticmethod
+    def _row_to_task(row):
+        task = json.loads(row['extra']) if row['extra'] else {}
+        task.update({'id': row['id'], 'text': row['text'], 'status': row['status'],
+                     'order': row['order'], 'created': row['created']})
+        return task
+
+
+class TrashReclaimer:
+    """
+    Background thread that physically removes trashed projects, so deleting a project
+    never waits on recursive file removal.
+    """
+    def __init__(self, purge_func):
+        import queue
+        import threading
+        self._purge = purge_func
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='checklist-trash-reclaimer', daemon=True)
+        self._thread.start()
+
+    def reclaim(self, project_id):
+        self._queue.put(project_id)
+
+    def _run(self):
+        while True:
+            project_id = self._queue.get()
+            try:
+                self._purge(project_id)
+            except Exception:
+                # Left in the trash; retried at the next startup
+                pass
+
+
+def copy_storage(src, dst):
+    """
+    Copy every project and task from one storage backend into another.
+    """
+    for meta in src.list_projects():
+        project = src.load_project(meta['id'])
+        if project is None:
+            continue
+        dst.save_project(project)
+        dst.save_tasks(project['id'], src.load_tasks(project['id']))
+
+
+def open_storage(base_path, backend=None):
+    """
+    Open the storage backend selected by `backend` or the CHECKLIST_STORAGE
+    environment variable ('files' (default) or 'sqlite').
+    A new SQLite database is seeded from the existing project/task files.
+    """
+    backend = backend or os.environ.get('CHECKLIST_STORAGE', 'files')
+    if backend == 'sqlite':
+        storage = SQLiteStorage(base_path)
+        if storage.is_new:
+            copy_storage(FileStorage(base_path), storage)
+        return storage
+    return FileStorage(base_path)
@@ -0,0 +1,114 @@
+# text_wrap.py
+# Word wrapping of task text for the Task/Note column, with a cache of the wrapped layouts.
+from collections import OrderedDict
+
+from PyQt5.QtGui import QFontMetrics, QFontMetricsF
+
+
+class WrapCache:
+    """
+    Wraps text to a pixel width, starting continuation lines with a marker, and caches the
+    result per (font, width bucket, marker) and text.
+    - Widths are rounded down to BUCKET_PX, so resizing the column by a few pixels keeps the
+      cached layouts, and going back to an earlier width finds them again.
+    - Texts are dict keys, so a lookup costs the text's hash, which Python caches on the string.
+    - Font metrics are built once per font and word widths measured once per word, instead of
+      measuring the growing line for every word. Widths are fractional (QFontMetricsF), so
+      summing them per line does not pile up rounding errors.
+    """
+    BUCKET_PX = 8
+    # (font, bucket, marker) layouts kept, and wrapped texts kept per layout
+    MAX_LAYOUTS = 8
+    MAX_TEXTS = 20000
+    MAX_WORDS = 100000
+
+    def __init__(self):
+        self._layouts = OrderedDict()
+        # font key -> (line height, advance function, {word: width})
+        self._fonts = {}
+
+    def bucket(self, width):
+        return max(10, width) // self.BUCKET_PX * self.BUCKET_PX
+
+    def wrap(self, text, width, font, marker='↪ '):
+        font_key = font.key()
+        key = (font_key, self.bucket(width), marker)
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self._layouts[key] = {}
+            if len(self._layouts) > self.MAX_LAYOUTS:
+                self._layouts.popitem(last=False)
+        else:
+            self._layouts.move_to_end(key)
+        wrapped = layout.get(text)
+        if wrapped is None:
+            if len(layout) >= self.MAX_TEXTS:
+                layout.clear()
+            wrapped = layout[text] = self._wrap(text, key[1], self._measure(font_key, font), marker)
+        return wrapped
+
+    def line_height(self, font):
+        """Height of one line of wrapped text in font (as laid out by the item delegates)."""
+        return self._metrics(font.key(), font)[0]
+
+    def clear(self):
+        self._layouts.clear()
+        self._fonts.clear()
+
+    def _metrics(self, font_key, font):
+        entry = self._fonts.get(font_key)
+        if entry is None:
+            metrics = QFontMetricsF(font)
+            # horizontalAdvance() replaced width() in Qt 5.11
+            advance = getattr(metrics, 'horizontalAdvance', metrics.width)
+            entry = self._fonts[font_key] = (QFontMetrics(font).height(), advance, {})
+        return entry
+
+    def _measure(self, font_key, font):
+        _line_height, advance, widths = self._metrics(font_key, font)
+        if len(widths) >= self.MAX_WORDS:
+            widths.clear()
+
+        def measure(word):
+            width = widths.get(word)
+            if width is None:
+                width = widths[word] = advance(word)
+            return width
+        return measure
+
+    @staticmethod
+    def _wrap(text, avail_width, measure, marker):
+        """
+        Greedy wrap: a word goes to the next line when the line would get wider than
+        avail_width (less the marker's width on continuation lines). Line widths are summed
+        from word widths.
+        """
+        space_width = measure(' ')
+        marker_width = measure(marker)
+        lines = text.splitlines() if '\n' in text else [text]
+        wrapped = []
+        for line in lines:
+            if not line:
+                wrapped.append("")
+                continue
+            current = ""
+            current_width = 0
+            first_line = True
+            for word in line.split(' '):
+                word_width = measure(word)
+                if not current:
+                    current = word
+                    current_width = word_width
+                    continue
+                # Use less width for wrapped lines (marker included)
+                width_limit = avail_width if first_line else avail_width - marker_width
+                if current_width + space_width + word_width > width_limit:
+                    wrapped.append(current)
+                    current = marker + word
+                    current_width = marker_width + word_width
+                    first_line = False
+                else:
+                    current += ' ' + word
+                    current_width += space_width + word_width
+            wrapped.append(current)
+        return '\n'.join(wrapped)
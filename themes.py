@@ -0,0 +1,171 @@
+# themes.py
+# Compiles the themes of themes.json once per theme: one style sheet for the main window and
+# ready-made colors, brushes and editor style sheets for the task status colors.
+# The widgets are matched by selectors (type and object name) instead of each getting its own
+# style sheet, so switching themes is a single style update however many widgets there are.
+import json
+import os
+
+from PyQt5.QtGui import QBrush, QColor
+
+# Object names the style sheet selects on
+PROJECT_LIST_NAME = "projectList"
+TASK_LIST_NAME = "taskList"
+
+# status -> (theme key of its background, default background)
+STATUS_BACKGROUNDS = {
+    "Pending": ("PendingBackground", "#ffeaea"),
+    "WIP": ("WIPBackground", "#fff9e0"),
+    "Done": ("DoneBackground", "#eaffea"),
+}
+
+
+def contrasting_font_color(bg_hex):
+    """
+    Given a background hex color, return '#000000' or '#ffffff' for best contrast.
+    """
+    if not bg_hex or not isinstance(bg_hex, str):
+        return '#000000'
+    hex_color = bg_hex.lstrip('#')
+    if len(hex_color) == 3:
+        hex_color = ''.join([c*2 for c in hex_color])
+    try:
+        r = int(hex_color[0:2], 16)
+        g = int(hex_color[2:4], 16)
+        b = int(hex_color[4:6], 16)
+    except Exception:
+        return '#000000'
+    # Per W3C luminance formula
+    luminance = (0.299 * r + 0.587 * g + 0.114 * b) / 255
+    return '#000000' if luminance > 0.5 else '#ffffff'
+
+
+def compile_stylesheet(theme):
+    """
+    Build the window style sheet for a theme dict (UIBackground, FontColor, TabBackground,
+    TabFontColor, ButtonBackground, ButtonFontColor). Keys missing from the theme leave the
+    widgets they color unstyled, as before.
+    """
+    rules = []
+    base = []
+    if 'UIBackground' in theme:
+        base.append(f"background-color: {theme['UIBackground']};")
+    if 'FontColor' in theme:
+        base.append(f"color: {theme['FontColor']};")
+    if base:
+        # The old bare declarations on the window, which reach every child widget
+        rules.append(f"* {{ {' '.join(base)} }}")
+    tab_bg = theme.get('TabBackground', '#e0e0e0')
+    tab_fg = theme.get('TabFontColor', '#222222')
+    tab = f"{{ background-color: {tab_bg}; color: {tab_fg}; }}"
+    if 'TabBackground' in theme:
+        rules.append(f"#{PROJECT_LIST_NAME}, #{PROJECT_LIST_NAME} QWidget {tab}")
+        rules.append(f"#{TASK_LIST_NAME}, #{TASK_LIST_NAME} QWidget {tab}")
+        rules.append(f"QHeaderView::section {tab}")
+    if 'ButtonBackground' in theme:
+        btn_fg = theme.get('ButtonFontColor', '#222')
+        rules.append(f"QPushButton {{ background-color: {theme['ButtonBackground']}; color: {btn_fg}; }}")
+    rules.append(f"QComboBox, QComboBox QAbstractItemView {tab}")
+    return "\n".join(rules)
+
+
+class ThemeFile:
+    """
+    Theme definitions of themes.json, read once and read again only when the file changed
+    (mtime or size). The selected theme is a setting (settings.py), not part of this file.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.themes = {}
+        # 'last_theme' that older versions kept in themes.json
+        self.legacy_last_theme = None
+        # (mtime, size) of the file as last read, None if it did not exist, False before load()
+        self._stamp = False
+
+    def exists(self):
+        return bool(self._stamp)
+
+    def load(self):
+        """
+        Return the {name: theme} dict; the same dict object as long as the file is unchanged.
+        """
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return self.themes
+        self._stamp = stamp
+        data = {}
+        if stamp is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception:
+                data = {}
+        if not isinstance(data, dict):
+            data = {}
+        legacy = data.pop('last_theme', None)
+        if legacy is not None:
+            self.legacy_last_theme = legacy
+        self.themes = data
+        return self.themes
+
+
+class StatusStyle:
+    """
+    Colors of one task status: background and contrasting font color as hex strings, QColors
+    and QBrushes, plus the style sheet of the status dropdown editor.
+    """
+    __slots__ = ('background_hex', 'foreground_hex', 'background_color', 'foreground_color',
+                 'background', 'foreground', 'editor_stylesheet')
+
+    def __init__(self, bg_hex):
+        fg_hex = contrasting_font_color(bg_hex)
+        self.background_hex = bg_hex
+        self.foreground_hex = fg_hex
+        self.background_color = QColor(bg_hex)
+        self.foreground_color = QColor(fg_hex)
+        self.background = QBrush(self.background_color)
+        self.foreground = QBrush(self.foreground_color)
+        self.editor_stylesheet = (
+            f"QComboBox {{ background-color: {bg_hex}; color: {fg_hex}; }} "
+            f"QComboBox QAbstractItemView {{ background-color: {bg_hex}; color: {fg_hex}; }}"
+        )
+
+
+class CompiledTheme:
+    """
+    A theme of themes.json compiled for use: the window style sheet and a StatusStyle per
+    status, so painting rows and changing statuses parse and allocate nothing.
+    """
+    __slots__ = ('name', 'stylesheet', 'status_styles')
+
+    def __init__(self, name, theme):
+        self.name = name
+        self.stylesheet = compile_stylesheet(theme)
+        self.status_styles = {status: StatusStyle(theme.get(key, default))
+                              for status, (key, default) in STATUS_BACKGROUNDS.items()}
+
+    def status_style(self, status):
+        """StatusStyle of status; unknown statuses get the Pending colors."""
+        return self.status_styles.get(status) or self.status_styles['Pending']
+
+
+class ThemeCache:
+    """
+    Compiled themes per theme name; compiled on first use. clear() after themes.json was
+    reloaded (e.g. a custom theme was saved).
+    """
+    def __init__(self):
+        self._themes = {}
+
+    def get(self, name, theme):
+        compiled = self._themes.get(name)
+        if compiled is None:
+            compiled = self._themes[name] = CompiledTheme(name, theme)
+        return compiled
+
+    def clear(self):
+        self._themes.clear()
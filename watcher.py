@@ -0,0 +1,182 @@
+# watcher.py
+# Notices changes made to projects/ and tasks/<id>/ outside the app (another instance,
+# a sync tool, a script) and turns them into fine-grained add/update/remove events.
+import os
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from storage import TaskJournal
+
+
+class ProjectWatcher(QObject):
+    """
+    Watches the projects/ directory (and its project files) and the journal of the open project of a FileStorage.
+    - projects/ changes are diffed against the known project files (by mtime), so only the
+      projects that were added, changed or removed are reported.
+    - The open project's journal is tailed from the last read offset; the new records are
+      reported as task upserts/removals. If the journal was rewritten by someone else (e.g.
+      compacted by another instance) tasksReset is emitted instead; after the app's own
+      compaction tailing just continues in the new file.
+    Events are debounced, as a single save usually produces several file notifications.
+    """
+    projectAdded = pyqtSignal(str)
+    projectUpdated = pyqtSignal(str)
+    projectRemoved = pyqtSignal(str)
+    # project_id, [(task_id, fields)], [removed task_id]; fields is a full task for new/replaced tasks
+    tasksChanged = pyqtSignal(str, list, list)
+    tasksReset = pyqtSignal(str)
+    DEBOUNCE_MS = 100
+
+    def __init__(self, storage, parent=None):
+        super().__init__(parent)
+        self.storage = storage
+        self._fs = QFileSystemWatcher(self)
+        self._fs.directoryChanged.connect(self._on_directory_changed)
+        self._fs.fileChanged.connect(self._on_file_changed)
+        # project_id -> mtime_ns of projects/<id>.json
+        self._project_mtimes = self._scan_projects()
+        if os.path.isdir(storage.projects_dir):
+            self._fs.addPath(storage.projects_dir)
+            # Project files are rewritten in place, which does not touch the directory
+            self._fs.addPaths([self._project_path(pid) for pid in self._project_mtimes])
+        self._project_id = None
+        self._journal_path = None
+        self._offset = 0
+        self._inode = None
+        self._projects_timer = self._make_timer(self._check_projects)
+        self._tasks_timer = self._make_timer(self._check_journal)
+
+    def watch_project(self, project_id, from_load=False):
+        """
+        Follow the journal of project_id from now on. With from_load, tailing starts where the
+        last load of that journal stopped reading, so nothing written after the load is missed.
+        """
+        for path in (self._journal_path, os.path.dirname(self._journal_path) if self._journal_path else None):
+            if path and path in self._fs.files() + self._fs.directories():
+                self._fs.removePath(path)
+        self._project_id = project_id
+        if project_id is None:
+            self._journal_path = None
+            return
+        journal = self.storage.journal(project_id)
+        self._journal_path = journal.path
+        if from_load:
+            self._offset, self._inode = journal.loaded_size, journal.loaded_inode
+        else:
+            try:
+                st = os.stat(journal.path)
+                self._offset, self._inode = st.st_size, st.st_ino
+            except OSError:
+                self._offset, self._inode = 0, None
+        # The directory catches the journal being created or replaced, the file catches appends
+        if os.path.isdir(journal.tasks_dir):
+            self._fs.addPath(journal.tasks_dir)
+        if os.path.exists(journal.path):
+            self._fs.addPath(journal.path)
+
+    def _make_timer(self, slot):
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(self.DEBOUNCE_MS)
+        timer.timeout.connect(slot)
+        return timer
+
+    def _on_directory_changed(self, path):
+        if path == self.storage.projects_dir:
+            self._projects_timer.start()
+        elif self._journal_path and path == os.path.dirname(self._journal_path):
+            self._tasks_timer.start()
+
+    def _on_file_changed(self, path):
+        if path == self._journal_path:
+            self._tasks_timer.start()
+        elif os.path.dirname(path) == self.storage.projects_dir:
+            self._projects_timer.start()
+
+    def _project_path(self, project_id):
+        return os.path.join(self.storage.projects_dir, f"{project_id}.json")
+
+    def _scan_projects(self):
+        mtimes = {}
+        try:
+            with os.scandir(self.storage.projects_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.json'):
+                        try:
+                            mtimes[entry.name[:-5]] = entry.stat().st_mtime_ns
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+        return mtimes
+
+    def _check_projects(self):
+        current = self._scan_projects()
+        previous = self._project_mtimes
+        self._project_mtimes = current
+        watched = set(self._fs.files())
+        for project_id in previous.keys() - current.keys():
+            self.projectRemoved.emit(project_id)
+        for project_id, mtime in current.items():
+            path = self._project_path(project_id)
+            # New files, and files replaced atomically (which drops their watch)
+            if path not in watched:
+                self._fs.addPath(path)
+            if project_id not in previous:
+                self.projectAdded.emit(project_id)
+            elif previous[project_id] != mtime:
+                self.projectUpdated.emit(project_id)
+
+    def _check_journal(self):
+        if self._journal_path is None:
+            return
+        # An atomic replace drops the file from the watch list: watch the new file
+        if os.path.exists(self._journal_path) and self._journal_path not in self._fs.files():
+            self._fs.addPath(self._journal_path)
+        result = TaskJournal.read_since(self._journal_path, self._offset, self._inode)
+        if result is None and self._reanchor_after_compaction():
+            result = TaskJournal.read_since(self._journal_path, self._offset, self._inode)
+        if result is None:
+            if os.path.exists(self._journal_path):
+                st = os.stat(self._journal_path)
+                self._offset, self._inode = st.st_size, st.st_ino
+                self.tasksReset.emit(self._project_id)
+            return
+        records, self._offset, self._inode = result
+        if not records:
+            return
+        # Fold the records into one change per task
+        changes = {}
+        removed = []
+        for record in records:
+            op = record.get('op')
+            if op == 'put' and isinstance(record.get('task'), dict) and 'id' in record['task']:
+                task_id = record['task']['id']
+                changes[task_id] = dict(record['task'])
+                if task_id in removed:
+                    removed.remove(task_id)
+            elif op == 'set' and 'id' in record:
+                fields = changes.setdefault(record['id'], {})
+                fields.update(record.get('fields', {}))
+            elif op == 'del' and 'id' in record:
+                changes.pop(record['id'], None)
+                if record['id'] not in removed:
+                    removed.append(record['id'])
+        self.tasksChanged.emit(self._project_id, list(changes.items()), removed)
+
+    def _reanchor_after_compaction(self):
+        """
+        If the journal is the file our own compaction wrote, continue tailing it from the end of
+        the compacted records instead of reporting a reset. Returns whether it did.
+        """
+        journal = self.storage.journal(self._project_id)
+        if journal.path != self._journal_path or journal.compacted_inode is None:
+            return False
+        try:
+            st = os.stat(self._journal_path)
+        except OSError:
+            return False
+        if st.st_ino != journal.compacted_inode or st.st_size < journal.compacted_size:
+            return False
+        self._offset, self._inode = journal.compacted_size, journal.compacted_inode
+        return True
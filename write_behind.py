@@ -0,0 +1,269 @@
+# write_behind.py
+# Write-behind persistence for task saves.
+# Task writes are queued and written by a worker thread, so status clicks and edits never block
+# the GUI on disk I/O. Repeated writes to the same task are coalesced into one write per flush window.
+import threading
+import time
+from collections import OrderedDict
+
+from storage import Storage
+
+
+class WriteBehindStorage(Storage):
+    """
+    Storage wrapper that queues task writes and flushes them from a background thread.
+    - save_task/save_tasks/update_task/delete_task are queued per (project_id, task_id); a newer
+      operation on the same task replaces or merges into the pending one.
+    - The queue is flushed `delay` seconds after the first pending write, on flush() and on close().
+    - Reading a project's tasks flushes pending writes first, so reads always see earlier writes.
+      read_tasks (for other threads) instead lays the pending writes over the backend's read.
+    - Project metadata changes are rare and written synchronously (after dropping pending task
+      writes of a deleted project, or flushing those of a trashed one).
+    Write failures are passed to on_error(exception) (called from the worker thread) and the failed
+    operations are retried with a growing delay.
+    After every write to a project, on_written(project_id, version_before, version_after) is called
+    (possibly from the worker thread) so caches can tell their own writes from external changes.
+    """
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(self, backend, delay=0.25, on_error=None, on_written=None):
+        self.backend = backend
+        self.delay = delay
+        self.on_error = on_error
+        self.on_written = on_written
+        # (project_id, task_id) -> ('save', task) | ('update', fields) | ('delete', None)
+        self._pending = OrderedDict()
+        # The batch _write_pending is writing right now (same layout)
+        self._in_flight = OrderedDict()
+        self._first_enqueued = None
+        self._closing = False
+        self._retry_delay = delay
+        # _cond guards the pending queue; _io_lock serializes every access to the backend
+        self._cond = threading.Condition()
+        self._io_lock = threading.RLock()
+        self._thread = threading.Thread(target=self._run, name='checklist-write-behind', daemon=True)
+        self._thread.start()
+
+    @property
+    def persistent_versions(self):
+        return self.backend.persistent_versions
+
+    # --- Reads (delegated, after flushing what they could depend on) ---
+    def list_projects(self):
+        with self._io_lock:
+            return self.backend.list_projects()
+
+    def load_project(self, project_id):
+        with self._io_lock:
+            return self.backend.load_project(project_id)
+
+    def project_exists(self, project_id):
+        with self._io_lock:
+            return self.backend.project_exists(project_id)
+
+    def load_tasks(self, project_id):
+        with self._io_lock:
+            self._write_pending()
+            return self.backend.load_tasks(project_id)
+
+    def read_tasks(self, project_id):
+        # Without the I/O lock or a flush: the backend reads on its own, and the writes that are
+        # queued or being written are laid over what it read
+        tasks = OrderedDict((task['id'], task) for task in self.backend.read_tasks(project_id))
+        with self._cond:
+            ops = [(key[1], kind, dict(payload) if payload is not None else None)
+                   for batch in (self._in_flight, self._pending)
+                   for key, (kind, payload) in batch.items() if key[0] == project_id]
+        for task_id, kind, payload in ops:
+            if kind == 'save':
+                tasks[task_id] = payload
+            elif kind == 'update':
+                if task_id in tasks:
+                    tasks[task_id] = dict(tasks[task_id], **payload)
+            else:
+                tasks.pop(task_id, None)
+        return list(tasks.values())
+
+    def project_version(self, project_id):
+        with self._io_lock:
+            return self.backend.project_version(project_id)
+
+    def listing_version(self):
+        with self._io_lock:
+            return self.backend.listing_version()
+
+    def refresh_project(self, project_id):
+        with self._io_lock:
+            return self.backend.refresh_project(project_id)
+
+    # --- Project metadata (synchronous) ---
+    def save_project(self, project):
+        with self._io_lock:
+            self._versioned_write(project['id'], self.backend.save_project, project)
+
+    def update_project(self, project_id, **fields):
+        with self._io_lock:
+            self._versioned_write(project_id, self.backend.update_project, project_id, **fields)
+
+    def delete_project(self, project_id):
+        with self._io_lock:
+            with self._cond:
+                for key in [k for k in self._pending if k[0] == project_id]:
+                    del self._pending[key]
+            self.backend.delete_project(project_id)
+
+    def trash_project(self, project_id):
+        with self._io_lock:
+            # Write what is queued first, so a restored project comes back complete
+            self._write_pending()
+            self.backend.trash_project(project_id)
+
+    def restore_project(self, project_id):
+        with self._io_lock:
+            self.backend.restore_project(project_id)
+
+    def list_trash(self):
+        with self._io_lock:
+            return self.backend.list_trash()
+
+    def purge_trash(self, project_id):
+        # Only touches trashed data, so it runs without holding the I/O lock
+        self.backend.purge_trash(project_id)
+
+    # --- Task writes (queued) ---
+    def save_tasks(self, project_id, tasks):
+        with self._cond:
+            for task in tasks:
+                # Snapshot the task so later in-memory edits don't race with the writer
+                self._pending.pop((project_id, task['id']), None)
+                self._pending[(project_id, task['id'])] = ('save', dict(task))
+            self._enqueued()
+
+    def update_task(self, project_id, task_id, **fields):
+        with self._cond:
+            key = (project_id, task_id)
+            op = self._pending.get(key)
+            if op is not None and op[0] in ('save', 'update'):
+                op[1].update(fields)
+            else:
+                self._pending[key] = ('update', dict(fields))
+            self._enqueued()
+
+    def delete_task(self, project_id, task_id):
+        with self._cond:
+            self._pending.pop((project_id, task_id), None)
+            self._pending[(project_id, task_id)] = ('delete', None)
+            self._enqueued()
+
+    # --- Flushing ---
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending)
+
+    def has_pending(self, project_id, task_id):
+        """
+        Whether a write of the task is queued or being written, i.e. the disk may still be
+        behind the caller's copy of it.
+        """
+        key = (project_id, task_id)
+        with self._cond:
+            return key in self._pending or key in self._in_flight
+
+    def flush(self):
+        """
+        Write everything that is pending, on the calling thread.
+        """
+        with self._io_lock:
+            self._write_pending()
+
+    def close(self):
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        with self._io_lock:
+            self._write_pending()
+            self.backend.close()
+
+    def _enqueued(self):
+        if self._first_enqueued is None:
+            self._first_enqueued = time.monotonic()
+        self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                # Debounce: let writes to the same task coalesce until the flush window ends
+                deadline = self._first_enqueued + self._retry_delay
+                while not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closing:
+                    return
+            with self._io_lock:
+                self._write_pending()
+
+    def _write_project_ops(self, project_id, ops):
+        saves = [task for _, (kind, task) in ops if kind == 'save']
+        if saves:
+            self.backend.save_tasks(project_id, saves)
+        for task_id, (kind, payload) in ops:
+            if kind == 'update':
+                self.backend.update_task(project_id, task_id, **payload)
+            elif kind == 'delete':
+                self.backend.delete_task(project_id, task_id)
+
+    def _versioned_write(self, project_id, func, *args, **kwargs):
+        if self.on_written is None:
+            return func(*args, **kwargs)
+        before = self.backend.project_version(project_id)
+        result = func(*args, **kwargs)
+        self.on_written(project_id, before, self.backend.project_version(project_id))
+        return result
+
+    def _write_pending(self):
+        """
+        Write the pending batch (caller holds _io_lock). Failed operations are re-queued,
+        merged with any newer field updates to the same task that arrived meanwhile.
+        """
+        with self._cond:
+            if not self._pending:
+                return
+            batch = self._in_flight = self._pending
+            self._pending = OrderedDict()
+            self._first_enqueued = None
+        by_project = OrderedDict()
+        for (project_id, task_id), op in batch.items():
+            by_project.setdefault(project_id, []).append((task_id, op))
+        failed = OrderedDict()
+        error = None
+        for project_id, ops in by_project.items():
+            try:
+                self._versioned_write(project_id, self._write_project_ops, project_id, ops)
+            except Exception as exc:
+                error = exc
+                for task_id, op in ops:
+                    failed[(project_id, task_id)] = op
+        with self._cond:
+            self._in_flight = OrderedDict()
+            if failed:
+                for key, op in failed.items():
+                    newer = self._pending.get(key)
+                    if newer is None:
+                        self._pending[key] = op
+                    elif newer[0] == 'update' and op[0] in ('save', 'update'):
+                        # Keep the failed write and apply the newer field changes on top of it
+                        op[1].update(newer[1])
+                        self._pending[key] = op
+                self._retry_delay = min(self._retry_delay * 2, self.MAX_RETRY_DELAY)
+                self._enqueued()
+            else:
+                self._retry_delay = self.delay
+        if error is not None and self.on_error is not None:
+            self.on_error(error)